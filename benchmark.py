@@ -0,0 +1,309 @@
+# Copyright 2026 The guicelint Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks for guice_lint.
+
+Usage: python benchmark.py [--sizes=100,1000,10000] [name ...]
+
+With no names every benchmark is run. The scaling benchmark generates jars
+with jargen at each size and lints them in a fresh process, reporting wall
+time, per-phase time from --profile and peak memory.
+"""
+
+import json
+import optparse
+import os
+import resource
+import shutil
+import StringIO
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+import guice_lint
+import jargen
+import methodvisitor
+import opcodes
+from classwriter import ClassWriter
+
+
+def Timed(f, *args):
+  """Returns the best wall time of a few runs of f(*args)."""
+  best = None
+  for _ in xrange(3):
+    start = time.time()
+    f(*args)
+    elapsed = time.time() - start
+    if best is None or elapsed < best:
+      best = elapsed
+  return best
+
+
+def BigClass(numMethods):
+  """Builds a class with numMethods annotated methods and some bytecode each."""
+  writer = ClassWriter('bench/Big%d' % numMethods)
+  for i in xrange(numMethods):
+    target = writer.Methodref('bench/Other%d' % (i % 50), 'call%d' % i, '()V')
+    # aload_0, invokevirtual target, nop * 16, return
+    code = '\x2a' + struct.pack('>BH', 0xb6, target) + '\x00' * 16 + '\xb1'
+    writer.AddMethod('method%d' % i, '(Ljava/lang/String;)V', code,
+                     annotations=[('com/google/inject/Provides', None)],
+                     parameterAnnotations=[[('com/google/inject/name/Named',
+                                             'name%d' % i)]])
+  return writer.ToBytes()
+
+
+def BenchParse(options):
+  """Parse time per KB should stay flat as classes grow."""
+  print 'JavaClassFile parse scaling'
+  print '%10s %10s %12s %12s' % ('methods', 'bytes', 'seconds', 'us/KB')
+  for numMethods in (250, 500, 1000, 2000, 4000):
+    data = BigClass(numMethods)
+    elapsed = Timed(lambda: guice_lint.JavaClassFile(StringIO.StringIO(data)))
+    print '%10d %10d %12.4f %12.1f' % (numMethods, len(data), elapsed,
+                                       elapsed * 1e6 / (len(data) / 1024.0))
+
+
+def MixedBytecode(numBlocks):
+  """Returns numBlocks repetitions of a block exercising most operand shapes."""
+  block = ('\x2a' +                                   # aload_0
+           struct.pack('>BH', 0xb6, 1) +              # invokevirtual
+           struct.pack('>BB', 0x12, 2) +              # ldc
+           struct.pack('>Bh', 0x11, -3) +             # sipush
+           struct.pack('>BBH', 0xc4, 0x19, 300) +     # wide aload
+           struct.pack('>BBHh', 0xc4, 0x84, 300, 1) + # wide iinc
+           struct.pack('>BBb', 0x84, 1, 1) +          # iinc
+           struct.pack('>BH', 0xbb, 4) +              # new
+           '\x59\x57\x00')                            # dup, pop, nop
+  code = ''
+  for _ in xrange(numBlocks):
+    # tableswitch pads to a 4-byte boundary from its own address.
+    code += block + '\xaa'
+    code += '\x00' * ((4 - (len(code) & 3)) & 3)
+    code += struct.pack('>iii', 0, 0, 1) + struct.pack('>ii', 0, 0)
+  return code
+
+
+def BenchDisassemble(options):
+  """Decoding throughput should not drop as methods get longer."""
+  print 'Disassemble (Opcode objects) vs Decode (InstructionStream) throughput'
+  print '%10s %14s %14s' % ('bytes', 'objects KB/s', 'stream KB/s')
+  for numBlocks in (100, 400, 1600, 3200):
+    code = MixedBytecode(numBlocks)
+    objects = Timed(guice_lint.Disassemble, code)
+    stream = Timed(opcodes.Decode, code)
+    kb = len(code) / 1024.0
+    print '%10d %14.1f %14.1f' % (len(code), kb / objects, kb / stream)
+
+
+def CallsFromObjects(code):
+  return [op for op in guice_lint.Disassemble(code)
+          if str(op).startswith('invoke')]
+
+
+def CallsFromStream(code):
+  stream = opcodes.Decode(code)
+  return [i for i in xrange(len(stream))
+          if stream.opcodes[i] in opcodes.invokeOpcodes]
+
+
+def BenchScanCalls(options):
+  """Call-site extraction: Opcode objects vs full decode vs ScanCalls."""
+  print 'Call-site extraction throughput (KB/s)'
+  print '%10s %12s %12s %12s' % ('bytes', 'objects', 'decode', 'scan')
+  for numBlocks in (100, 400, 1600, 3200):
+    code = MixedBytecode(numBlocks)
+    kb = len(code) / 1024.0
+    print '%10d %12.1f %12.1f %12.1f' % (
+        len(code), kb / Timed(CallsFromObjects, code),
+        kb / Timed(CallsFromStream, code), kb / Timed(opcodes.ScanCalls, code))
+
+
+BUILDER = 'com/google/inject/binder/AnnotatedBindingBuilder'
+LINKED_BUILDER = 'com/google/inject/binder/LinkedBindingBuilder'
+
+
+def BindingModule(numBindings):
+  """Builds a module whose configure() binds numBindings keys, a third each
+  as bind(A.class).to(B.class), as bind(A.class).annotatedWith(named).to(...)
+  with named = Names.named(...) kept in a local, and as
+  bind(Key.get(A.class, Names.named(...))).to(...).
+  """
+  name = 'bench/Module%d' % numBindings
+  w = ClassWriter(name, 'com/google/inject/AbstractModule')
+  bindClass = w.Methodref(name, 'bind', '(Ljava/lang/Class;)L%s;' % BUILDER)
+  bindKey = w.Methodref(name, 'bind',
+                        '(Lcom/google/inject/Key;)L%s;' % LINKED_BUILDER)
+  named = w.Methodref('com/google/inject/name/Names', 'named',
+                      '(Ljava/lang/String;)Lcom/google/inject/name/Named;')
+  keyGet = w.Methodref('com/google/inject/Key', 'get',
+                       '(Ljava/lang/Class;Ljava/lang/annotation/Annotation;)'
+                       'Lcom/google/inject/Key;')
+  annotatedWith = w.InterfaceMethodref(
+      BUILDER, 'annotatedWith',
+      '(Ljava/lang/annotation/Annotation;)L%s;' % LINKED_BUILDER)
+  to = w.InterfaceMethodref(BUILDER, 'to', '(Ljava/lang/Class;)'
+                            'Lcom/google/inject/binder/ScopedBindingBuilder;')
+  linkedTo = w.InterfaceMethodref(
+      LINKED_BUILDER, 'to',
+      '(Ljava/lang/Class;)Lcom/google/inject/binder/ScopedBindingBuilder;')
+  code = ''
+  for i in xrange(numBindings):
+    source = w.LoadClassConstant('bench/Service%d' % i)
+    target = w.LoadClassConstant('bench/Impl%d' % i)
+    ldcName = struct.pack('>BH', 0x13, w.String('name%d' % i))
+    if i % 3 == 0:
+      code += ('\x2a' + source + struct.pack('>BH', 0xb6, bindClass) +
+               target + struct.pack('>BHBB', 0xb9, to, 2, 0) + '\x57')
+    elif i % 3 == 1:
+      code += (ldcName + struct.pack('>BH', 0xb8, named) + '\x4c' +
+               '\x2a' + source + struct.pack('>BH', 0xb6, bindClass) +
+               '\x2b' + struct.pack('>BHBB', 0xb9, annotatedWith, 2, 0) +
+               target + struct.pack('>BHBB', 0xb9, linkedTo, 2, 0) + '\x57')
+    else:
+      code += ('\x2a' + source + ldcName + struct.pack('>BH', 0xb8, named) +
+               struct.pack('>BH', 0xb8, keyGet) +
+               struct.pack('>BH', 0xb6, bindKey) +
+               target + struct.pack('>BHBB', 0xb9, linkedTo, 2, 0) + '\x57')
+  w.AddMethod('configure', '()V', code + '\xb1')
+  return w.ToBytes()
+
+
+def BenchInterpreter(options):
+  """Interpreting configure() should cost at most ~2x the call-site walk."""
+  print 'configure() facts: call-site heuristic vs interpreter'
+  print '%10s %10s %12s %12s %8s %12s %12s' % (
+      'bindings', 'bytes', 'heuristic s', 'interpret s', 'ratio',
+      'heur. found', 'interp. found')
+  for numBindings in (30, 300, 1500):
+    classFile = guice_lint.JavaClassFile(
+        StringIO.StringIO(BindingModule(numBindings)))
+    info = classFile.namedMethods['configure'][0].code.info
+    classFile.CallNames()
+    heuristic = Timed(lambda: methodvisitor.VisitMethod(
+        classFile, classFile.ScanCode(info)))
+    interpreted = Timed(lambda: methodvisitor.VisitMethod(
+        classFile, classFile.ReadCode(info).code, None, True))
+    found = [len(set(methodvisitor.VisitMethod(
+        classFile, stream, None, interpret)['bindings'][0]))
+             for stream, interpret in
+             ((classFile.ScanCode(info), False),
+              (classFile.ReadCode(info).code, True))]
+    print '%10d %10d %12.5f %12.5f %8.2f %12d %12d' % tuple(
+        [numBindings, len(info), heuristic, interpreted,
+         interpreted / heuristic] + found)
+
+
+def BenchClosure(options):
+  """InjectedTransitiveClosure time per injectable class should stay flat."""
+  print 'InjectedTransitiveClosure scaling (classes preloaded)'
+  print '%12s %12s %12s' % ('injectables', 'seconds', 'us/class')
+  directory = tempfile.mkdtemp()
+  try:
+    for injectables in (500, 1000, 2000, 4000, 8000):
+      spec = jargen.SpecForClassCount(100)._replace(injectables=injectables,
+                                                    fillers=0)
+      jar = os.path.join(directory, 'closure%d.jar' % injectables)
+      jargen.GenerateJar(jar, spec)
+      session = guice_lint.LintSession([jar])
+      for i in xrange(injectables):
+        session.LoadClass(jargen.Impl(i) + '.class')
+      elapsed = Timed(session.InjectedTransitiveClosure,
+                      [(jargen.Impl(0), None)])
+      session.Close()
+      print '%12d %12.4f %12.1f' % (injectables, elapsed,
+                                    elapsed * 1e6 / injectables)
+  finally:
+    shutil.rmtree(directory)
+
+
+def LintInThisProcess(jar):
+  """Lints jar with profiling on and prints the measurements as JSON."""
+  start = time.time()
+  profile = guice_lint.Profile()
+  session = guice_lint.LintSession([jar], profile=profile)
+  try:
+    manifest = session.classPath.Open('META-INF/MANIFEST.MF').read()
+    session.Lint(guice_lint.GetMain(manifest))
+  finally:
+    session.Close()
+  elapsed = time.time() - start
+  print json.dumps({
+      'wall': elapsed,
+      'phases': profile.phases,
+      'counters': profile.counters,
+      'maxrss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+  })
+
+
+SCALING_PHASES = ('load class', 'constant pool', 'disassemble', 'call fanout',
+                  'module bindings', 'injection closure')
+
+
+def BenchScaling(options):
+  """End to end lint time and memory on generated jars of growing size."""
+  print 'End to end scaling (total seconds per phase, peak RSS)'
+  print '%8s %8s %8s %8s %8s %8s %8s %8s %8s %8s %8s' % (
+      'classes', 'jar KB', 'gen s', 'wall s', 'load', 'cpool', 'disasm',
+      'fanout', 'modules', 'closure', 'RSS MB')
+  directory = tempfile.mkdtemp()
+  try:
+    for size in options.sizes:
+      jar = os.path.join(directory, 'gen%d.jar' % size)
+      start = time.time()
+      jargen.GenerateJar(jar, jargen.SpecForClassCount(size))
+      generated = time.time() - start
+      with open(os.devnull, 'w') as devnull:
+        output = subprocess.check_output(
+            [sys.executable, __file__, '--lint', jar], stderr=devnull)
+      result = json.loads(output.splitlines()[-1])
+      phases = [result['phases'].get(phase, [0, 0.0, 0.0])[1]
+                for phase in SCALING_PHASES]
+      print ('%8d %8d' + ' %8.2f' * 8 + ' %8.1f') % tuple(
+          [size, os.path.getsize(jar) // 1024, generated, result['wall']] +
+          phases + [result['maxrss'] / 1024.0])
+  finally:
+    shutil.rmtree(directory)
+
+
+BENCHMARKS = {
+    'calls': BenchScanCalls,
+    'closure': BenchClosure,
+    'disassemble': BenchDisassemble,
+    'interpreter': BenchInterpreter,
+    'parse': BenchParse,
+    'scaling': BenchScaling,
+}
+
+
+def main(argv):
+  parser = optparse.OptionParser(usage='%prog [options] [benchmark ...]')
+  parser.add_option('--sizes', default='100,1000,10000',
+                    help='Comma separated class counts for the scaling '
+                    'benchmark, e.g. 100,1000,10000,100000.')
+  parser.add_option('--lint', help=optparse.SUPPRESS_HELP)
+  options, names = parser.parse_args(argv[1:])
+  if options.lint:
+    LintInThisProcess(options.lint)
+    return
+  options.sizes = [int(size) for size in options.sizes.split(',')]
+  for name in names or sorted(BENCHMARKS):
+    BENCHMARKS[name](options)
+    print
+
+
+if __name__ == '__main__':
+  main(sys.argv)
@@ -0,0 +1,104 @@
+# Copyright 2026 The guicelint Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Least recently used cache of loaded classes with a memory budget.
+
+Sizes are whatever the caller says they are, normally
+JavaClassFile.EstimateSize. An evicted class is simply dropped; the caller
+re-creates it from the parse cache or the class path on its next miss.
+"""
+
+from collections import OrderedDict
+
+
+class ClassCache(object):
+  def __init__(self, maxBytes=None, maxEntries=None):
+    """Either limit may be None for none; with neither this never evicts."""
+    self.maxBytes = maxBytes
+    self.maxEntries = maxEntries
+    self.bounded = maxBytes is not None or maxEntries is not None
+    # name -> (classFile, size), least recently used first.
+    self.entries = OrderedDict()
+    self.size = 0
+    self.peakSize = 0
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def __contains__(self, name):
+    return name in self.entries
+
+  def __len__(self):
+    return len(self.entries)
+
+  def Get(self, name):
+    """Returns the class loaded as name, or None, and marks it as used."""
+    if not self.bounded:
+      # Recency only matters for eviction; skip the reordering.
+      entry = self.entries.get(name)
+    else:
+      entry = self.entries.pop(name, None)
+      if entry is not None:
+        self.entries[name] = entry
+    if entry is None:
+      self.misses += 1
+      return None
+    self.hits += 1
+    return entry[0]
+
+  def Put(self, name, classFile, size):
+    old = self.entries.pop(name, None)
+    if old is not None:
+      self.size -= old[1]
+    self.entries[name] = (classFile, size)
+    self.size += size
+    self.peakSize = max(self.peakSize, self.size)
+    self.Evict()
+
+  def Discard(self, name):
+    """Drops name if it is cached, say because what it was loaded from went."""
+    entry = self.entries.pop(name, None)
+    if entry is not None:
+      self.size -= entry[1]
+
+  def Evict(self):
+    # The class just added always stays, however big it is.
+    entries = self.entries
+    while len(entries) > 1 and (
+        (self.maxBytes is not None and self.size > self.maxBytes) or
+        (self.maxEntries is not None and len(entries) > self.maxEntries)):
+      _, (_, size) = entries.popitem(last=False)
+      self.size -= size
+      self.evictions += 1
+
+  def Room(self):
+    """Returns about how many classes the budget holds, or None if unlimited.
+
+    A byte budget is converted using the average size of the cached classes.
+    """
+    room = self.maxEntries
+    if self.maxBytes is not None:
+      average = self.size // len(self.entries) if self.entries else 1
+      byBytes = self.maxBytes // max(1, average)
+      if room is None or byBytes < room:
+        room = byBytes
+    return room
+
+  def Clear(self):
+    self.entries.clear()
+    self.size = 0
+
+  def Stats(self):
+    return 'class cache: %d classes, %d evicted, peak %d KB' % (
+        len(self.entries), self.evictions, self.peakSize // 1024)
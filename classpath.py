@@ -0,0 +1,459 @@
+# Copyright 2026 The guicelint Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Class path made of jars and class directories.
+
+Every entry name is indexed up front, first container wins, so a lookup is a
+single dict access however many jars there are. Jars are memory mapped and
+their central directories read once; see JarContainer. The classes and jars
+bundled inside a Spring Boot fat jar or a war follow the jar itself; see
+NestedContainers.
+"""
+
+import itertools
+import mmap
+import os
+import struct
+import zipfile
+import zlib
+
+from array import array
+from multiprocessing.pool import ThreadPool
+
+
+# End of central directory record, its ZIP64 locator and ZIP64 record.
+END_RECORD = struct.Struct('<4s4H2LH')
+END_RECORD_MAGIC = 'PK\x05\x06'
+ZIP64_LOCATOR = struct.Struct('<4sLQL')
+ZIP64_LOCATOR_MAGIC = 'PK\x06\x07'
+ZIP64_END_RECORD = struct.Struct('<4sQ2H2L4Q')
+# Central directory file header and the name and extra lengths of a local one.
+CENTRAL_HEADER = struct.Struct('<4s4B4HL2L5H2L')
+CENTRAL_HEADER_MAGIC = 'PK\x01\x02'
+LOCAL_HEADER_SIZE = 30
+LOCAL_LENGTHS = struct.Struct('<HH')
+EXTRA_HEADER = struct.Struct('<HH')
+U8 = struct.Struct('<Q')
+
+STORED = 0
+DEFLATED = 8
+
+# Where fat jars and wars keep their own classes, and the jars they bundle.
+NESTED_CLASSES = ('BOOT-INF/classes/', 'WEB-INF/classes/')
+NESTED_LIBS = ('BOOT-INF/lib/', 'WEB-INF/lib/')
+
+
+class EntryFile(object):
+  """What Open returns: a file-like holding one entry's bytes."""
+  __slots__ = ('data',)
+
+  def __init__(self, data):
+    self.data = data
+
+  def read(self):
+    data = self.data
+    self.data = ''
+    return data
+
+
+class JarContainer(object):
+  """A jar read through a memory map of the whole file.
+
+  The central directory is parsed once into an index of each entry's local
+  header offset, sizes, CRC and compression method, kept in arrays rather
+  than an object per entry. Deflated entries are inflated straight from the
+  mapping and stored ones are handed out as buffers over it, without a
+  copy. Every process linting the same jar shares its pages in the page
+  cache. CRCs are not checked.
+
+  With zeroCopy False, stored entries are copied out as well, for callers
+  that keep classes around while the jar may be rewritten in place.
+  """
+
+  def __init__(self, path, zeroCopy=True):
+    self.path = path
+    self.zeroCopy = zeroCopy
+    self.map = None
+    # name -> entry number in the columns below
+    self.entries = {}
+    self.offsets = array('L')
+    self.compressedSizes = array('L')
+    self.sizes = array('L')
+    self.crcs = array('L')
+    self.methods = array('B')
+    self.Index(self.Map(), *self.Bounds())
+
+  def Map(self):
+    if self.map is None:
+      f = open(self.path, 'rb')
+      try:
+        self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+      finally:
+        f.close()
+    return self.map
+
+  def Bounds(self):
+    """Returns where the jar starts and ends in Map(); None is its end."""
+    return 0, None
+
+  def Index(self, data, base, limit=None):
+    """Reads the central directory of the jar at data[base:limit].
+
+    The offsets in the index are into data itself, whatever base is.
+    """
+    if limit is None:
+      limit = len(data)
+    tail = max(base, limit - END_RECORD.size - 0xffff)
+    end = data.rfind(END_RECORD_MAGIC, tail, limit)
+    if end < 0:
+      raise zipfile.BadZipfile('%s: no end of central directory' % self.path)
+    _, _, _, _, count, _, start, _ = END_RECORD.unpack_from(data, end)
+    locator = end - ZIP64_LOCATOR.size
+    if (locator >= base and
+        data[locator:locator + 4] == ZIP64_LOCATOR_MAGIC):
+      record = ZIP64_LOCATOR.unpack_from(data, locator)[2]
+      (_, _, _, _, _, _, _, count, _, start) = ZIP64_END_RECORD.unpack_from(
+          data, base + record)
+    start += base
+    entries = self.entries
+    offset = start
+    for i in xrange(count):
+      (magic, _, _, _, _, flags, method, _, _, crc, compressedSize, size,
+       nameLength, extraLength, commentLength, _, _, _,
+       localOffset) = CENTRAL_HEADER.unpack_from(data, offset)
+      if magic != CENTRAL_HEADER_MAGIC:
+        raise zipfile.BadZipfile('%s: bad central directory' % self.path)
+      offset += CENTRAL_HEADER.size
+      name = data[offset:offset + nameLength]
+      offset += nameLength
+      if 0xffffffff in (compressedSize, size, localOffset):
+        size, compressedSize, localOffset = self.Zip64Sizes(
+            data, offset, extraLength, size, compressedSize, localOffset)
+      offset += extraLength + commentLength
+      if name.endswith('/'):
+        continue
+      if flags & 1:
+        raise NotImplementedError('%s: %s is encrypted' % (self.path, name))
+      entries[name] = len(self.offsets)
+      self.offsets.append(base + localOffset)
+      self.compressedSizes.append(compressedSize)
+      self.sizes.append(size)
+      self.crcs.append(crc)
+      self.methods.append(method)
+
+  def Zip64Sizes(self, data, offset, extraLength, size, compressedSize,
+                 localOffset):
+    """Reads the values a central header left to its ZIP64 extra field."""
+    end = offset + extraLength
+    while offset < end:
+      tag, length = EXTRA_HEADER.unpack_from(data, offset)
+      offset += EXTRA_HEADER.size
+      if tag == 1:
+        values = [size, compressedSize, localOffset]
+        for i in xrange(3):
+          if values[i] == 0xffffffff:
+            values[i] = U8.unpack_from(data, offset)[0]
+            offset += U8.size
+        return values
+      offset += length
+    return size, compressedSize, localOffset
+
+  def Names(self):
+    return self.entries.iterkeys()
+
+  def DataOffset(self, data, i):
+    """Returns where entry i's (maybe compressed) bytes start in data."""
+    offset = self.offsets[i]
+    nameLength, extraLength = LOCAL_LENGTHS.unpack_from(data, offset + 26)
+    return offset + LOCAL_HEADER_SIZE + nameLength + extraLength
+
+  def Read(self, name):
+    """Returns the entry's bytes, a buffer over the map if it is stored."""
+    i = self.entries[name]
+    data = self.Map()
+    start = self.DataOffset(data, i)
+    method = self.methods[i]
+    if method == STORED:
+      if self.zeroCopy:
+        return buffer(data, start, self.sizes[i])
+      return data[start:start + self.sizes[i]]
+    if method == DEFLATED:
+      return zlib.decompressobj(-zlib.MAX_WBITS).decompress(
+          buffer(data, start, self.compressedSizes[i]))
+    raise NotImplementedError('%s: %s uses compression method %d' % (
+        self.path, name, method))
+
+  def Open(self, name):
+    return EntryFile(self.Read(name))
+
+  def CacheKey(self, name):
+    """Returns (crc, size) identifying the entry's contents, or None."""
+    i = self.entries[name]
+    return self.crcs[i], self.sizes[i]
+
+  def Size(self, name):
+    return self.sizes[self.entries[name]]
+
+  def Close(self):
+    # Classes parsed from stored entries may still be looking at the map,
+    # which is unmapped once the last of them lets go of it.
+    self.map = None
+
+
+class NestedJarContainer(JarContainer):
+  """A jar inside another, such as a library in a fat jar's BOOT-INF/lib.
+
+  Fat jars and wars store their inner jars uncompressed, which makes each
+  one a stretch of the outer jar's mapping: its central directory is
+  indexed in place, with every offset kept as one into that mapping, so
+  its classes are inflated straight out of the outer jar only when they
+  are read. A deflated inner jar is inflated into memory to be indexed and
+  kept there until Close; nothing is ever extracted to disk.
+  """
+
+  def __init__(self, outer, name):
+    self.outer = outer
+    self.name = name
+    self.stored = outer.methods[outer.entries[name]] == STORED
+    JarContainer.__init__(self, '%s!/%s' % (outer.path, name),
+                          outer.zeroCopy)
+
+  def Map(self):
+    if self.stored:
+      return self.outer.Map()
+    if self.map is None:
+      self.map = str(self.outer.Read(self.name))
+    return self.map
+
+  def Bounds(self):
+    if not self.stored:
+      return 0, None
+    outer = self.outer
+    i = outer.entries[self.name]
+    start = outer.DataOffset(outer.Map(), i)
+    return start, start + outer.sizes[i]
+
+
+class PrefixContainer(object):
+  """The entries of a container under prefix, named without it.
+
+  A fat jar's own classes are under BOOT-INF/classes/ and a war's under
+  WEB-INF/classes/, but are loaded as if they were at the root.
+  """
+
+  def __init__(self, container, prefix):
+    self.container = container
+    self.prefix = prefix
+    self.path = container.path + '!/' + prefix
+
+  def Names(self):
+    prefix = self.prefix
+    n = len(prefix)
+    for name in self.container.Names():
+      if name.startswith(prefix) and len(name) > n:
+        yield name[n:]
+
+  def Open(self, name):
+    return self.container.Open(self.prefix + name)
+
+  def CacheKey(self, name):
+    return self.container.CacheKey(self.prefix + name)
+
+  def Size(self, name):
+    return self.container.Size(self.prefix + name)
+
+  def Close(self):
+    pass
+
+
+class DirectoryContainer(object):
+  def __init__(self, path):
+    self.path = path
+
+  def Names(self):
+    for root, _, files in os.walk(self.path):
+      prefix = os.path.relpath(root, self.path).replace(os.sep, '/')
+      for f in files:
+        if prefix == '.':
+          yield f
+        else:
+          yield prefix + '/' + f
+
+  def __contains__(self, name):
+    return os.path.isfile(os.path.join(self.path, *name.split('/')))
+
+  def Open(self, name):
+    return open(os.path.join(self.path, *name.split('/')), 'rb')
+
+  def CacheKey(self, name):
+    return None
+
+  def Stamp(self, name):
+    """Returns (mtime, size) of the file, to tell if it has changed."""
+    st = os.stat(os.path.join(self.path, *name.split('/')))
+    return st.st_mtime, st.st_size
+
+  def Size(self, name):
+    return os.path.getsize(os.path.join(self.path, *name.split('/')))
+
+  def Close(self):
+    pass
+
+
+def OpenContainer(path, zeroCopy=True):
+  if os.path.isdir(path):
+    return DirectoryContainer(path)
+  return JarContainer(path, zeroCopy)
+
+
+def NestedContainers(container):
+  """Returns containers for what a fat jar or war bundles, if it is one.
+
+  That is its own classes, then its inner jars in the order they are
+  stored, which is the order its launcher puts them on the class path.
+  """
+  if not isinstance(container, JarContainer):
+    return []
+  nested = []
+  for prefix in NESTED_CLASSES:
+    if any(name.startswith(prefix) for name in container.Names()):
+      nested.append(PrefixContainer(container, prefix))
+  entries = container.entries
+  jars = sorted((name for name in entries
+                 if name.startswith(NESTED_LIBS) and name.endswith('.jar')),
+                key=entries.get)
+  nested.extend(NestedJarContainer(container, name) for name in jars)
+  return nested
+
+
+class ClassPath(object):
+  def __init__(self, paths=()):
+    self.containers = []
+    self.index = {}
+    for path in paths:
+      self.Add(path)
+
+  def Add(self, path):
+    container = OpenContainer(path)
+    self.AddContainer(container)
+    for nested in NestedContainers(container):
+      self.AddContainer(nested)
+
+  def AddContainer(self, container):
+    self.containers.append(container)
+    index = self.index
+    for name in container.Names():
+      if name not in index:
+        index[name] = container
+
+  def __contains__(self, name):
+    return name in self.index
+
+  def Open(self, name):
+    """Returns a file-like whose read() gives the entry's bytes.
+
+    That is a str, or a read-only buffer for an entry stored uncompressed
+    in a jar.
+    """
+    return self.index[name].Open(name)
+
+  def CacheKey(self, name):
+    return self.index[name].CacheKey(name)
+
+  def Container(self, name):
+    """Returns the container name is read from."""
+    return self.index[name]
+
+  def Size(self, name):
+    return self.index[name].Size(name)
+
+  def Close(self):
+    for container in self.containers:
+      container.Close()
+
+
+def ReadEntries(classPath, names):
+  return dict((name, classPath.Open(name).read()) for name in names)
+
+
+class Inflater(object):
+  """Reads class path entries ahead of time on a pool of threads.
+
+  zlib lets go of the GIL while it inflates, so the entries the lint says
+  it will load next are inflated while it parses the ones before. Entries
+  are read a chunk per task, since a task costs about as much as inflating
+  a small class. At most maxEntries are buffered at once; Read takes an
+  entry out of the buffer, waiting if it is still being inflated, and reads
+  anything never prefetched directly.
+  """
+  CHUNK_SIZE = 16
+  LOOKAHEAD = 64
+
+  def __init__(self, classPath, threads, maxEntries=512):
+    self.classPath = classPath
+    self.pool = ThreadPool(threads)
+    self.maxEntries = maxEntries
+    # name -> AsyncResult of the {name: bytes} of the chunk it is read in
+    self.pending = {}
+    self.hits = 0
+    self.misses = 0
+
+  def Prefetch(self, names):
+    """Starts reading names, in order, as far as the buffer has room.
+
+    Looks no further than LOOKAHEAD names ahead, so that prefetching again
+    and again from a long worklist stays cheap.
+    """
+    pending = self.pending
+    chunk = []
+    for name in itertools.islice(names, self.LOOKAHEAD):
+      if len(pending) + len(chunk) >= self.maxEntries:
+        break
+      if name in pending or name in chunk:
+        continue
+      chunk.append(name)
+      if len(chunk) == self.CHUNK_SIZE:
+        self.Submit(chunk)
+        chunk = []
+    if chunk:
+      self.Submit(chunk)
+
+  def Submit(self, names):
+    result = self.pool.apply_async(ReadEntries, (self.classPath, names))
+    for name in names:
+      self.pending[name] = result
+
+  def Read(self, name):
+    """Returns the entry's bytes, as ClassPath.Open(name).read() would."""
+    result = self.pending.pop(name, None)
+    if result is None:
+      self.misses += 1
+      return self.classPath.Open(name).read()
+    self.hits += 1
+    return result.get()[name]
+
+  def __contains__(self, name):
+    return name in self.pending
+
+  def Discard(self, name):
+    """Frees name's place in the buffer if it turned out not to be needed."""
+    self.pending.pop(name, None)
+
+  def Close(self):
+    self.pool.terminate()
+    self.pending.clear()
+
+  def Stats(self):
+    return 'inflater: %d reads prefetched, %d direct, %d still buffered' % (
+        self.hits, self.misses, len(self.pending))
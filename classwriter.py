@@ -0,0 +1,144 @@
+# Copyright 2026 The guicelint Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Minimal writer for Java .class files.
+
+Produces just enough of the class file format for guice_lint to chew on, so
+benchmarks can build inputs without a JDK.
+"""
+
+import struct
+
+ACC_PUBLIC = 0x0001
+ACC_STATIC = 0x0008
+ACC_INTERFACE = 0x0200
+ACC_ABSTRACT = 0x0400
+
+
+class ClassWriter(object):
+  def __init__(self, name, superName='java/lang/Object',
+               accessFlags=ACC_PUBLIC):
+    self.accessFlags = accessFlags
+    self.constants = []
+    self.constantIndex = {}
+    self.fields = []
+    self.methods = []
+    self.name = name
+    self.classIndex = self.Class(name)
+    self.superIndex = self.Class(superName)
+
+  def AddConstant(self, key, encoded):
+    if key in self.constantIndex:
+      return self.constantIndex[key]
+    self.constants.append(encoded)
+    index = len(self.constants)
+    self.constantIndex[key] = index
+    return index
+
+  def Utf8(self, s):
+    return self.AddConstant(('str', s), struct.pack('>BH', 1, len(s)) + s)
+
+  def Int(self, value):
+    return self.AddConstant(('int', value), struct.pack('>Bi', 3, value))
+
+  def Class(self, name):
+    return self.AddConstant(('classref', name),
+                            struct.pack('>BH', 7, self.Utf8(name)))
+
+  def String(self, s):
+    return self.AddConstant(('stringref', s),
+                            struct.pack('>BH', 8, self.Utf8(s)))
+
+  def NameAndType(self, name, desc):
+    return self.AddConstant(('nametypedescriptor', name, desc),
+                            struct.pack('>BHH', 12, self.Utf8(name),
+                                        self.Utf8(desc)))
+
+  def Methodref(self, owner, name, desc):
+    return self.AddConstant(('methodref', owner, name, desc),
+                            struct.pack('>BHH', 10, self.Class(owner),
+                                        self.NameAndType(name, desc)))
+
+  def InterfaceMethodref(self, owner, name, desc):
+    return self.AddConstant(('interfacemethodref', owner, name, desc),
+                            struct.pack('>BHH', 11, self.Class(owner),
+                                        self.NameAndType(name, desc)))
+
+  def LoadClassConstant(self, name):
+    """Returns the ldc or ldc_w instruction pushing name.class."""
+    index = self.Class(name)
+    if index < 256:
+      return struct.pack('>BB', 0x12, index)
+    return struct.pack('>BH', 0x13, index)
+
+  def Fieldref(self, owner, name, desc):
+    return self.AddConstant(('fieldref', owner, name, desc),
+                            struct.pack('>BHH', 9, self.Class(owner),
+                                        self.NameAndType(name, desc)))
+
+  def Annotations(self, annotations):
+    """Encodes a list of (type, named) pairs as annotation structures."""
+    out = struct.pack('>H', len(annotations))
+    for annotationType, named in annotations:
+      out += struct.pack('>H', self.Utf8('L%s;' % annotationType))
+      if named is None:
+        out += struct.pack('>H', 0)
+      else:
+        out += struct.pack('>HHBH', 1, self.Utf8('value'), ord('s'),
+                           self.Utf8(named))
+    return out
+
+  def Attribute(self, name, info):
+    return struct.pack('>HI', self.Utf8(name), len(info)) + info
+
+  def AnnotationAttributes(self, annotations, parameterAnnotations):
+    attributes = []
+    if annotations:
+      attributes.append(self.Attribute('RuntimeVisibleAnnotations',
+                                       self.Annotations(annotations)))
+    if parameterAnnotations is not None:
+      info = chr(len(parameterAnnotations))
+      for parameter in parameterAnnotations:
+        info += self.Annotations(parameter)
+      attributes.append(self.Attribute('RuntimeVisibleParameterAnnotations',
+                                       info))
+    return attributes
+
+  def AddField(self, name, desc, annotations=(), accessFlags=ACC_PUBLIC):
+    attributes = self.AnnotationAttributes(annotations, None)
+    self.fields.append(struct.pack('>HHHH', accessFlags, self.Utf8(name),
+                                   self.Utf8(desc), len(attributes)) +
+                       ''.join(attributes))
+
+  def AddMethod(self, name, desc, code=None, annotations=(),
+                parameterAnnotations=None, accessFlags=ACC_PUBLIC,
+                maxStack=8, maxLocals=8):
+    attributes = self.AnnotationAttributes(annotations, parameterAnnotations)
+    if code is not None:
+      info = struct.pack('>HHI', maxStack, maxLocals, len(code)) + code
+      info += struct.pack('>HH', 0, 0)
+      attributes.insert(0, self.Attribute('Code', info))
+    self.methods.append(struct.pack('>HHHH', accessFlags, self.Utf8(name),
+                                    self.Utf8(desc), len(attributes)) +
+                        ''.join(attributes))
+
+  def ToBytes(self):
+    out = struct.pack('>IHHH', 0xCAFEBABE, 0, 50, len(self.constants) + 1)
+    out += ''.join(self.constants)
+    out += struct.pack('>HHHH', self.accessFlags, self.classIndex,
+                       self.superIndex, 0)
+    out += struct.pack('>H', len(self.fields)) + ''.join(self.fields)
+    out += struct.pack('>H', len(self.methods)) + ''.join(self.methods)
+    out += struct.pack('>H', 0)
+    return out
@@ -19,491 +19,1429 @@ Finds mismatches between @Provides and @Inject usages.
 
 __author__ = 'cswenson@google.com (Christopher Swenson)'
 
+import multiprocessing
+import optparse
+import os
+import re
 import struct
-import zipfile
+import sys
 
+from array import array
+from opcodes import Decode
+from opcodes import InstructionStream
+from opcodes import ScanCalls
 from opcodes import opcodeTable
+from classcache import ClassCache
+from classpath import ClassPath
+from classpath import EntryFile
+from classpath import Inflater
 from collections import namedtuple
+from methodvisitor import Interpreted
+from methodvisitor import NO_FACTS
+from methodvisitor import VisitMethod
+from parsecache import DirectoryIndex
+from parsecache import ParseCache
+from profiler import Profile
 
 Constant = namedtuple('Constant', 'type value')
 Field = namedtuple('Field', 'accessFlags nameIndex descriptorIndex attributes')
 Method = namedtuple('Method', 'accessFlags nameIndex descriptorIndex attributes'
                     ' code')
-Attribute = namedtuple('Attribute', 'index info annotations parameterAnnotations')
+# info is None unless the attribute is retained (see RETAINED_ATTRIBUTES);
+# offset and length say where it is in the class file, or in the Code
+# attribute for the attributes of a Code.
+Attribute = namedtuple('Attribute', 'index info annotations'
+                       ' parameterAnnotations offset length')
 JavaException = namedtuple('JavaException', 'startPc endPc handlerPc catchType')
 Code = namedtuple('Code', 'maxStack maxLocals code exceptions attributes')
 Annotation = namedtuple('Annotation', 'typeIndex pairs')
+# What linting needs of a class that references nothing in Guice; see
+# ShallowParse.
+ShallowClass = namedtuple('ShallowClass', 'superName constructors')
 
-# Global table of .class files parsed.
-loadedClasses = {}
+
+class MainClassError(LookupError): pass
+
+
+# Precompiled big-endian readers for the class file format.
+U1U2 = struct.Struct('>BH')
+U2 = struct.Struct('>H')
+U2U2 = struct.Struct('>HH')
+U2U4 = struct.Struct('>HI')
+U2X4 = struct.Struct('>HHHH')
+S4 = struct.Struct('>i')
+F4 = struct.Struct('>f')
+S8 = struct.Struct('>q')
+F8 = struct.Struct('>d')
+HEADER = struct.Struct('>IHHH')
+CODE_HEADER = struct.Struct('>HHI')
+
+# Bump whenever JavaClassFile.Summarize changes shape, to invalidate caches.
+PARSER_VERSION = 2
+
+# Attributes whose raw info a parsed class keeps. Annotations are kept
+# parsed and Code decoded, lazily, from its info; nothing the lint does
+# needs the bytes of any other attribute, such as LineNumberTable,
+# LocalVariableTable, StackMapTable or Signature.
+RETAINED_ATTRIBUTES = frozenset(['Code'])
+
+# Approximate bytes of Python objects per parsed class, constant, field or
+# method and decoded instruction, for JavaClassFile.EstimateSize.
+CLASS_OVERHEAD = 1500
+CONSTANT_OVERHEAD = 300
+MEMBER_OVERHEAD = 600
+INSTRUCTION_OVERHEAD = 9
+
+# A class file whose bytes do not contain this names no Guice type, so it
+# can be no module and have no injected members.
+GUICE_PACKAGE = 'com/google/inject'
+# Searches str and buffer alike, which 'in' does not.
+GUICE_REFERENCE = re.compile(GUICE_PACKAGE)
+
+# Size after the tag of each fixed size constant pool entry.
+CONSTANT_SIZES = {3: 4, 4: 4, 5: 8, 6: 8, 7: 2, 8: 2, 9: 4, 10: 4, 11: 4,
+                  12: 4, 15: 3, 16: 2, 17: 4, 18: 4, 19: 2, 20: 2}
+
+# The ClassPath a --jobs worker process parses from; see InitWorker.
+workerClassPath = None
 
 def main(argv):
-  global jar
-  jar = zipfile.ZipFile(open(argv[1]))
-  global namelist
-  namelist = set(jar.namelist())
-  manifest = jar.open('META-INF/MANIFEST.MF').read()
-  mainClass = GetMain(manifest)
-  fname = FindFile(mainClass)
-  classFile = LoadClass(fname)
-  for m in classFile.methods:
-    name = classFile.constants[m.nameIndex].value
-    if name == 'main':
-      providers, injected = classFile.GetProvidersAndInjectors(m)
-      stillNeeded = set(injected) - set(providers)
-      if stillNeeded:
-        print "Error! Could not resolve the following injections:"
-        for x in sorted(stillNeeded):
-          if x[1] is not None:
-            print '  Named(%s) %s' % (x[1], x[0])
-          else:
-            print '  ' + str(x[0])
-        exit(1)
-
-def LoadClass(fname):
-  if fname in loadedClasses:
-    return loadedClasses[fname]
-  classFile = JavaClassFile(jar.open(fname))
-  loadedClasses[fname] = classFile
-  return classFile
+  parser = optparse.OptionParser(
+      usage='%prog [options] app.jar|classes-dir ...')
+  parser.add_option('--cache-dir',
+                    help='Cache parsed classes in this directory between runs; '
+                    'classes in directories are only parsed again once '
+                    'their mtime or size changes.')
+  parser.add_option('--classpath', default='',
+                    help='Jars and class directories, separated by "%s", to '
+                    'search after the app.' % os.pathsep)
+  parser.add_option('--main-class',
+                    help='Lint from the main methods of this class rather than '
+                    'the Main-Class of the manifest.')
+  parser.add_option('--jobs', type='int', default=1,
+                    help='Parse classes in this many worker processes.')
+  parser.add_option('--call-depth', type='int', default=3,
+                    help='How many calls deep from main to look for modules; '
+                    '0 for no limit.')
+  parser.add_option('--inflate-threads', type='int', default=0,
+                    help='Without --jobs, inflate the classes about to be '
+                    'parsed on this many threads.')
+  parser.add_option('--max-classes', type='int',
+                    help='Keep at most this many parsed classes in memory.')
+  parser.add_option('--max-class-memory', type='int', metavar='MB',
+                    help='Keep roughly this many MB of parsed classes in '
+                    'memory.')
+  parser.add_option('--profile', action='store_true',
+                    help='Print per-phase timings and counters to stderr.')
+  parser.add_option('--profile-format', choices=('table', 'json'),
+                    default='table', help='table (default) or json.')
+  options, args = parser.parse_args(argv[1:])
+  if not args:
+    parser.error('expected at least one jar or class directory')
+  parseCache = None
+  if options.cache_dir:
+    parseCache = ParseCache(options.cache_dir, PARSER_VERSION)
+  profile = None
+  if options.profile:
+    profile = Profile()
+  maxClassBytes = None
+  if options.max_class_memory:
+    maxClassBytes = options.max_class_memory << 20
+  session = LintSession(args + [p for p in
+                               options.classpath.split(os.pathsep) if p],
+                        parseCache=parseCache, jobs=options.jobs,
+                        callDepth=options.call_depth or None, profile=profile,
+                        maxClassBytes=maxClassBytes,
+                        maxClasses=options.max_classes,
+                        inflateThreads=options.inflate_threads)
+  try:
+    mainClass = options.main_class
+    if mainClass is None:
+      if 'META-INF/MANIFEST.MF' not in session.classPath:
+        parser.error('no META-INF/MANIFEST.MF to find the main class in; '
+                     'use --main-class')
+      manifest = session.classPath.Open('META-INF/MANIFEST.MF').read()
+      mainClass = GetMain(manifest)
+    try:
+      stillNeeded = session.Lint(mainClass)
+    except MainClassError, e:
+      parser.error(str(e))
+    if stillNeeded:
+      print "Error! Could not resolve the following injections:"
+      for x in sorted(stillNeeded):
+        if x[1] is not None:
+          print '  Named(%s) %s' % (x[1], x[0])
+        else:
+          print '  ' + str(x[0])
+      exit(1)
+  finally:
+    if maxClassBytes is not None or options.max_classes is not None:
+      print >> sys.stderr, session.loadedClasses.Stats()
+    if session.inflater is not None:
+      print >> sys.stderr, session.inflater.Stats()
+    if profile is not None:
+      # Before Close, which drops the classes these count.
+      print >> sys.stderr, session.PrefilterStats()
+      print >> sys.stderr, session.RetentionStats()
+    session.Close()
+    if parseCache is not None:
+      print >> sys.stderr, parseCache.Stats()
+      for index in session.directoryIndexes.itervalues():
+        print >> sys.stderr, index.Stats()
+    if profile is not None:
+      if options.profile_format == 'json':
+        print >> sys.stderr, profile.Json()
+      else:
+        print >> sys.stderr, profile.Table()
+
+def InitWorker(classPath):
+  # Jars are read through read-only mappings, which forked workers can
+  # share with the parent as they are.
+  global workerClassPath
+  workerClassPath = classPath
+
+def ParseSummary(fname):
+  return fname, JavaClassFile(workerClassPath.Open(fname)).Summarize()
+
+def PrefilterSummary(args):
+  """Prefilters fname as LintSession.LoadPrefiltered would, in a worker.
+
+  args are fname and whether to parse it. Returns fname, its ShallowClass
+  if it references no Guice, the bytes read and, if parse and it does
+  reference Guice, its summary.
+  """
+  fname, parse = args
+  data = workerClassPath.Open(fname).read()
+  if GUICE_REFERENCE.search(data) is None:
+    return fname, ShallowParse(data), len(data), None
+  summary = None
+  if parse:
+    summary = JavaClassFile(EntryFile(data)).Summarize()
+  return fname, None, len(data), summary
+
+
+class LintSession(object):
+  """Everything one lint needs: the class path, loaded classes and options.
+
+  Sessions share no state, so several can lint different jars in the same
+  process, and closing one lets go of everything it loaded.
+
+  Args:
+    paths: jars and class directories, searched in order, or a ClassPath.
+    parseCache: optional ParseCache of class summaries; may be shared.
+    jobs: parse classes in this many worker processes.
+    callDepth: how many calls deep from main to look for modules; None for
+      no limit.
+    profile: optional Profile collecting phase timings and counters.
+    maxClassBytes, maxClasses: optional budgets for the parsed classes kept
+      in memory; the least recently used are dropped and parsed again if
+      needed.
+    warmClasses: optional ClassCache of classes shared between sessions,
+      keyed on (entry name, crc, size), that outlives this one.
+    inflateThreads: without jobs, read and inflate the classes about to be
+      parsed on this many threads.
+    ownsClassPath: whether Close closes the class path; False for one whose
+      containers outlive the session.
+  """
+
+  def __init__(self, paths, parseCache=None, jobs=1, callDepth=3,
+               profile=None, maxClassBytes=None, maxClasses=None,
+               warmClasses=None, inflateThreads=0, ownsClassPath=True):
+    if isinstance(paths, ClassPath):
+      self.classPath = paths
+    else:
+      self.classPath = ClassPath(paths)
+    self.ownsClassPath = ownsClassPath
+    self.warmClasses = warmClasses
+    self.parseCache = parseCache
+    self.jobs = jobs
+    self.callDepth = callDepth
+    self.profile = profile
+    self.loadedClasses = ClassCache(maxClassBytes, maxClasses)
+    # fname -> ShallowClass of every class found to reference no Guice.
+    self.shallowClasses = {}
+    self.shallowBytes = 0
+    # Classes parsed in this process and the class file bytes they dropped;
+    # see JavaClassFile.droppedSize.
+    self.classesParsed = 0
+    self.droppedBytes = 0
+    # Container -> DirectoryIndex of each class directory read from, with a
+    # parse cache; saved on Close.
+    self.directoryIndexes = {}
+    # Memoized GetMethodCalled results, keyed on 'owner.method'.
+    self.calledByMethod = {}
+    # Classes are built with a subclass of JavaClassFile carrying the
+    # profile, so profiling one session leaves every other one untouched.
+    self.classFileType = JavaClassFile
+    self.pool = None
+    self.inflater = None
+    if jobs > 1:
+      self.pool = multiprocessing.Pool(jobs, InitWorker, (self.classPath,))
+    elif inflateThreads > 0:
+      self.inflater = Inflater(self.classPath, inflateThreads)
+    # Whether PrefetchClasses does anything.
+    self.prefetching = self.pool is not None or self.inflater is not None
+    if profile is not None:
+      profile.Instrument(self, 'LoadClass', 'load class')
+      profile.Instrument(self, 'LoadPrefiltered', 'load class')
+      profile.Instrument(self, 'PrefetchClasses', 'load class')
+      profile.Instrument(self, 'GetAllCalled', 'call fanout')
+      profile.Instrument(self, 'FindAllBindings', 'module bindings')
+      profile.Instrument(self, 'InjectedTransitiveClosure',
+                         'injection closure')
+      self.classFileType = type('ProfiledJavaClassFile', (JavaClassFile,),
+                                {'profile': profile})
+      profile.Instrument(self.classFileType, 'ReadConstants', 'constant pool')
+      profile.Instrument(self.classFileType, 'ReadCode', 'disassemble')
+      profile.Instrument(self.classFileType, 'ScanCode', 'disassemble')
+
+  def Close(self):
+    """Stops the workers, closes the class path if it owns it and drops
+    loaded classes."""
+    if self.pool is not None:
+      self.pool.terminate()
+      self.pool = None
+    if self.inflater is not None:
+      self.inflater.Close()
+    for container, index in self.directoryIndexes.iteritems():
+      # Whether the class path has the name is not enough: another
+      # container may have it after the file is gone from this one.
+      index.Save(container.__contains__)
+    if self.ownsClassPath:
+      self.classPath.Close()
+    self.loadedClasses.Clear()
+    self.shallowClasses.clear()
+    self.calledByMethod.clear()
+
+  def Lint(self, mainClass):
+    """Returns the (class, name) keys injected but never provided.
+
+    Every method named main in mainClass, a dotted or slashed class name, is
+    taken as an entry point. Raises MainClassError if the class path does
+    not have mainClass.
+    """
+    fname = self.FindFile(mainClass)
+    if fname is None:
+      raise MainClassError('main class %s not on the class path' % mainClass)
+    classFile = self.LoadClass(fname)
+    stillNeeded = set()
+    for m in classFile.namedMethods.get('main', ()):
+      providers, injected = self.GetProvidersAndInjectors(classFile, m)
+      stillNeeded.update(set(injected) - set(providers))
+    return stillNeeded
+
+  def FindFile(self, className):
+    className = className.replace('.', '/')
+    className += '.class'
+    if className in self.classPath:
+      return className
+
+  def LoadClass(self, fname):
+    classFile = self.loadedClasses.Get(fname)
+    if classFile is not None:
+      return classFile
+    classFile = self.FromCache(fname)
+    if classFile is None:
+      classFile = self.ParseClass(fname)
+    elif self.inflater is not None:
+      self.inflater.Discard(fname)
+    self.KeepClass(fname, classFile)
+    return classFile
+
+  def Read(self, fname):
+    """Returns fname's bytes, from the inflater if there is one."""
+    if self.inflater is not None:
+      return self.inflater.Read(fname)
+    return self.classPath.Open(fname).read()
+
+  def LoadPrefiltered(self, fname):
+    """Returns fname parsed, or its ShallowClass if it references no Guice.
+
+    Only for the passes that need nothing else of such a class; a class
+    already parsed in full is returned as is.
+    """
+    classFile = self.loadedClasses.Get(fname)
+    if classFile is None:
+      classFile = self.shallowClasses.get(fname)
+    if classFile is not None:
+      return classFile
+    data = self.Read(fname)
+    if GUICE_REFERENCE.search(data) is None:
+      classFile = ShallowParse(data)
+      self.KeepShallow(fname, classFile, len(data))
+      return classFile
+    classFile = self.FromCache(fname)
+    if classFile is None:
+      classFile = self.ParseClass(fname, data)
+    self.KeepClass(fname, classFile)
+    return classFile
+
+  def PrefilterStats(self):
+    """Says how much of the class path was skipped for referencing no Guice.
+    """
+    classes = sum(1 for name in self.classPath.index
+                  if name.endswith('.class'))
+    return ('prefilter: %d of %d classes Guice-free and only shallow-parsed '
+            '(%d KB)' % (len(self.shallowClasses), classes,
+                         self.shallowBytes >> 10))
+
+  def RetentionStats(self):
+    """Says how much memory parsed classes saved by dropping attributes."""
+    return ('retention: %d bytes of class file dropped per class parsed '
+            '(%d KB over %d classes)' % (
+                self.droppedBytes // max(1, self.classesParsed),
+                self.droppedBytes >> 10, self.classesParsed))
+
+  def KeepShallow(self, fname, shallowClass, size):
+    self.shallowClasses[fname] = shallowClass
+    self.shallowBytes += size
+    if self.profile is not None:
+      self.profile.Count('classes shallow-parsed')
+      self.profile.Count('bytes shallow-parsed', size)
+
+  def KeepSummary(self, fname, summary):
+    """Keeps a class a worker parsed, caching its summary."""
+    self.KeepClass(fname, self.classFileType.FromSummary(summary))
+    if self.profile is not None:
+      self.CountParsed(fname)
+    if self.parseCache is not None:
+      self.ToParseCache(fname, summary)
+
+  def KeepClass(self, fname, classFile):
+    size = classFile.EstimateSize()
+    self.loadedClasses.Put(fname, classFile, size)
+    if self.warmClasses is not None:
+      key = self.classPath.CacheKey(fname)
+      if key is not None:
+        self.warmClasses.Put((fname,) + key, classFile, size)
+
+  def FromCache(self, fname):
+    """Returns fname from the warm classes or the parse cache, or None."""
+    if self.warmClasses is not None:
+      key = self.classPath.CacheKey(fname)
+      if key is not None:
+        classFile = self.warmClasses.Get((fname,) + key)
+        if classFile is not None:
+          if self.profile is not None:
+            self.profile.Count('classes kept warm')
+          return classFile
+    return self.FromParseCache(fname)
+
+  def ParseClass(self, fname, data=None):
+    if data is None:
+      data = self.Read(fname)
+    classFile = self.classFileType(EntryFile(data))
+    self.classesParsed += 1
+    self.droppedBytes += classFile.droppedSize
+    if self.profile is not None:
+      self.CountParsed(fname)
+      self.profile.Count('bytes dropped after parsing', classFile.droppedSize)
+    if self.parseCache is not None:
+      self.ToParseCache(fname, classFile.Summarize())
+    return classFile
+
+  def FromParseCache(self, fname):
+    if self.parseCache is None:
+      return None
+    key = self.classPath.CacheKey(fname)
+    if key is not None:
+      summary = self.parseCache.Get(fname, *key)
+    else:
+      summary = self.DirectoryIndex(fname).Get(
+          fname, self.classPath.Container(fname).Stamp(fname))
+    if summary is None:
+      return None
+    if self.profile is not None:
+      self.profile.Count('classes from cache')
+    return self.classFileType.FromSummary(summary)
+
+  def ToParseCache(self, fname, summary):
+    key = self.classPath.CacheKey(fname)
+    if key is not None:
+      self.parseCache.Put(fname, key[0], key[1], summary)
+    else:
+      self.DirectoryIndex(fname).Put(
+          fname, self.classPath.Container(fname).Stamp(fname), summary)
+
+  def DirectoryIndex(self, fname):
+    """Returns the DirectoryIndex of the class directory fname is in.
+
+    Classes in directories have no CRC to key the parse cache on, so they
+    are cached by mtime and size in one index per directory instead.
+    """
+    container = self.classPath.Container(fname)
+    index = self.directoryIndexes.get(container)
+    if index is None:
+      index = DirectoryIndex(self.parseCache.directory, container.path,
+                             self.parseCache.version)
+      self.directoryIndexes[container] = index
+    return index
+
+  def PrefetchClasses(self, classNames, prefiltered=False):
+    """Loads a wave of classes the analysis is about to need, in parallel.
+
+    With an inflater rather than jobs, only reads the classes ahead, and
+    without either does nothing; LoadClass will then parse them one by one.
+    With a class budget, only the first classes that comfortably fit are
+    loaded, so the wave does not evict itself before it is used. A
+    prefiltered wave is for LoadPrefiltered, and its classes that reference
+    no Guice are only shallow-parsed; see PrefilterInWorkers.
+    """
+    if self.pool is None:
+      if self.inflater is not None:
+        self.inflater.Prefetch(self.Unloaded(classNames))
+      return
+    loadedClasses = self.loadedClasses
+    room = loadedClasses.Room()
+    if room is not None:
+      room = max(2, room // 2)
+    pending = []
+    seen = set()
+    for className in classNames:
+      if room is not None and len(seen) >= room:
+        break
+      fname = self.FindFile(className)
+      if fname is None or fname in seen:
+        continue
+      seen.add(fname)
+      if fname in loadedClasses:
+        continue
+      if prefiltered:
+        if fname not in self.shallowClasses:
+          pending.append(fname)
+        continue
+      classFile = self.FromCache(fname)
+      if classFile is not None:
+        self.KeepClass(fname, classFile)
+      else:
+        pending.append(fname)
+    if prefiltered:
+      if len(pending) < 2:
+        # LoadPrefiltered does as well on its own.
+        return
+      pending = self.PrefilterInWorkers(pending)
+    if len(pending) < 2:
+      for fname in pending:
+        self.KeepClass(fname, self.ParseClass(fname))
+      return
+    chunkSize = max(1, len(pending) // (self.jobs * 4))
+    for fname, summary in self.pool.imap_unordered(ParseSummary, pending,
+                                                   chunkSize):
+      self.KeepSummary(fname, summary)
+
+  def PrefilterInWorkers(self, fnames):
+    """Has the workers prefilter fnames and keeps what they found.
+
+    Classes that reference no Guice are kept shallow-parsed. The rest are
+    parsed by the workers as well, unless there are warm classes or a parse
+    cache to look in first, as LoadPrefiltered would; those not found there
+    are returned, still to be parsed.
+    """
+    parse = self.warmClasses is None and self.parseCache is None
+    chunkSize = max(1, len(fnames) // (self.jobs * 4))
+    rest = []
+    for fname, shallowClass, size, summary in self.pool.imap_unordered(
+        PrefilterSummary, [(fname, parse) for fname in fnames], chunkSize):
+      if shallowClass is not None:
+        self.KeepShallow(fname, shallowClass, size)
+      elif summary is not None:
+        self.KeepSummary(fname, summary)
+      else:
+        classFile = self.FromCache(fname)
+        if classFile is not None:
+          self.KeepClass(fname, classFile)
+        else:
+          rest.append(fname)
+    return rest
+
+  def Unloaded(self, classNames):
+    """Yields the file of each of classNames not loaded in any form yet."""
+    for className in classNames:
+      fname = self.FindFile(className)
+      if (fname is not None and fname not in self.loadedClasses and
+          fname not in self.shallowClasses):
+        yield fname
+
+  def CountParsed(self, fname):
+    self.profile.Count('classes parsed')
+    self.profile.Count('bytes decompressed', self.classPath.Size(fname))
+
+  def GetProvidersAndInjectors(self, classFile, method):
+    methodName = classFile.constants[method.nameIndex].value
+    classRef = classFile.constants[classFile.classIndex]
+    className = classFile.constants[classRef.value].value
+    allCalled, injected = self.CallGraph([className + '.' + methodName],
+                                         self.callDepth)
+    modules = self.FindModules(allCalled)
+    providers = self.FindAllProviders(modules)
+    newProviders, newInjected = self.FindAllBindings(modules)
+    providers += newProviders
+    injected += newInjected
+    newProviders, newInjected = self.InjectedTransitiveClosure(injected)
+    providers += newProviders
+    return providers, newInjected
+
+  def FindAllBindings(self, modules):
+    providers = []
+    injected = []
+    done = set()
+    while modules:
+      if (self.prefetching and
+          self.FindFile(modules[-1]) not in self.loadedClasses):
+        self.PrefetchClasses(modules)
+      module = modules.pop()
+      if module in done:
+        continue
+      newProviders, newInjected, newModules = self.FindBindings(module)
+      providers += newProviders
+      providers += self.FindProviders(module)
+      modules += newModules
+      injected += newInjected
+      done.add(module)
+    return providers, injected
+
+  def FindBindings(self, module):
+    classFile = self.LoadClass(self.FindFile(module))
+    providers = []
+    injectors = []
+    newModules = []
+    for method in classFile.namedMethods.get('configure', ()):
+      newProviders, newInjectors, modules = classFile.Facts(method)['bindings']
+      providers += newProviders
+      injectors += newInjectors
+      newModules += modules
+    return providers, injectors, newModules
+
+  def FindAllProviders(self, modules):
+    providers = []
+    for module in modules:
+      providers += self.FindProviders(module)
+    return providers
+
+  def FindProviders(self, module):
+    classFile = self.LoadClass(self.FindFile(module))
+    providers = []
+    for method in classFile.methods:
+      provides = None
+      named = None
+      for attribute in method.attributes:
+        if attribute.annotations is not None:
+          for annotation in attribute.annotations:
+            if annotation.typeIndex[0] == ('L', 'com/google/inject/Provides'):
+              provides = classFile.constants[method.descriptorIndex].value
+            elif annotation.typeIndex[0] == ('L', 'com/google/inject/name/Named'):
+              named = classFile.constants[annotation.pairs[0][1][1]].value
+      if provides is not None:
+        provides = GetReturnType(provides)
+        providers.append((provides, named))
+    return providers
+
+  def FindModules(self, methodNames):
+    modules = []
+    for methodName in methodNames:
+      fname, mname = methodName.split('.')
+      f = self.FindFile(fname)
+      if not f:
+        continue
+      otherClass = self.LoadPrefiltered(f)
+      if (isinstance(otherClass, ShallowClass) or
+          mname not in otherClass.namedMethods):
+        continue
+      superClass = otherClass.constants[otherClass.constants[otherClass.superIndex].value].value
+      if superClass == 'com/google/inject/AbstractModule':
+        modules.append(fname)
+    return modules
+
+  def CallGraph(self, roots, maxDepth):
+    """Finds the methods reachable from roots in at most maxDepth calls.
+
+    Walks the call graph breadth first, one GetAllCalled wave per level,
+    expanding every 'owner.method' at most once. maxDepth None means no
+    limit. Returns the set of called methods and the classes injected by
+    the expanded ones.
+    """
+    called = set()
+    injected = []
+    wave = list(set(roots))
+    depth = 0
+    while wave and (maxDepth is None or depth < maxDepth):
+      newCalled, newInjected = self.GetAllCalled(wave)
+      injected += newInjected
+      wave = []
+      for methodName in newCalled:
+        if methodName not in called:
+          called.add(methodName)
+          wave.append(methodName)
+      depth += 1
+    return called, injected
+
+  def GetAllCalled(self, methodNames):
+    called = []
+    injected = []
+    calledByMethod = self.calledByMethod
+    self.PrefetchClasses(methodName.split('.')[0]
+                         for methodName in methodNames
+                         if methodName not in calledByMethod)
+    for methodName in methodNames:
+      if methodName not in calledByMethod:
+        calledByMethod[methodName] = self.GetMethodCalled(methodName)
+      newCalled, newInjected = calledByMethod[methodName]
+      called += newCalled
+      injected += newInjected
+    return called, injected
+
+  def GetMethodCalled(self, methodName):
+    """Returns what every overload of 'owner.method' calls and injects."""
+    called = []
+    injected = []
+    fname, mname = methodName.split('.')
+    f = self.FindFile(fname)
+    if not f:
+      return called, injected
+    otherClass = self.LoadClass(f)
+    if mname not in otherClass.namedMethods:
+      return called, injected
+    for otherMethod in otherClass.namedMethods[mname]:
+      facts = otherClass.Facts(otherMethod)
+      called += facts['called']
+      injected += facts['injected']
+    return called, injected
+
+  def InjectedTransitiveClosure(self, injected):
+    """Follows @Inject constructors and fields from the injected keys.
+
+    Each (class, name) key enters the worklist once. Returns the set of keys
+    provided by injectable classes and the set of every key required.
+    """
+    providers = set()
+    required = set(injected)
+    todo = list(required)
+
+    def Require(keys):
+      for key in keys:
+        if key not in required:
+          required.add(key)
+          todo.append(key)
+
+    while todo:
+      className, name = todo.pop()
+      fname = self.FindFile(className)
+      if not fname:
+        continue
+      if (self.prefetching and fname not in self.loadedClasses and
+          fname not in self.shallowClasses and
+          (self.inflater is None or fname not in self.inflater)):
+        # todo is popped from the end, so that is what is needed soonest.
+        self.PrefetchClasses([className] + [c for c, _ in reversed(todo)],
+                             prefiltered=True)
+      classFile = self.LoadPrefiltered(fname)
+      if isinstance(classFile, ShallowClass):
+        # Nothing in it is annotated @Inject.
+        if '()V' in classFile.constructors:
+          providers.add((className, None))
+        continue
+      classRef = classFile.FindClass(className)
+      if classRef is None: continue
+      foundAnnotation = False
+      for method in classFile.methods:
+        methodName = classFile.constants[method.nameIndex].value
+        if methodName != '<init>':
+          continue
+        # Guice will inject argument-less constructurs.
+        if classFile.constants[method.descriptorIndex].value == '()V':
+          providers.add((className, None))
+          break
+
+        methodAnnotations = None
+        parameterAnnotations = None
+        for attribute in method.attributes:
+          if attribute.parameterAnnotations is not None:
+            parameterAnnotations = attribute.parameterAnnotations
+          if attribute.annotations is not None:
+            methodAnnotations = attribute.annotations
+          if parameterAnnotations is not None and methodAnnotations is not None:
+            break
+        if methodAnnotations is not None:
+          for annotation in methodAnnotations:
+            if annotation.typeIndex[0][1] == 'com/google/inject/Inject':
+              foundAnnotation = True
+              providers.add((className, None))
+              argClasses = GetArgumentClasses(classFile.constants[method.descriptorIndex].value, parameterAnnotations, classFile)
+              # Don't include Injector, etc.
+              argClasses = [x for x in argClasses if not x[0].startswith('com/google/inject')]
+              # TODO(cswenson): Read annotations for @Named in arguments.
+              Require(argClasses)
+              break
+      if not foundAnnotation:
+        continue
+      # Check fields for @Inject, and for superclasses.
+      Require(self.FindInjectedFields(className))
+
+    return providers, required
+
+  def FindInjectedFields(self, className):
+    classFile = self.LoadPrefiltered(self.FindFile(className))
+    needed = []
+    if isinstance(classFile, ShallowClass):
+      superClass = classFile.superName
+      if superClass is None or superClass.startswith('java'):
+        return needed
+      return self.FindInjectedFields(superClass)
+    for field in classFile.fields:
+      for attribute in field.attributes:
+        if attribute.annotations is None:
+          continue
+        bind = None
+        named = None
+        for annotation in attribute.annotations:
+          if annotation.typeIndex[0][1] == 'com/google/inject/Inject':
+            desc = classFile.constants[field.descriptorIndex].value
+            bind = ParseBaseType(desc)[0][1]
+            needed.append((bind, None))
+          elif annotation.typeIndex[0] == ('L', 'com/google/inject/name/Named'):
+            named = classFile.constants[annotation.pairs[0][1][1]].value
+            needed[-1] = (bind, named)
+    superClass = classFile.constants[classFile.constants[classFile.superIndex].value].value
+    if superClass.startswith('java'):
+      return needed
+    needed += self.FindInjectedFields(superClass)
+    return needed
+
 
 def GetMain(manifest):
-  for l in manifest.split('\n'):
+  # A stored manifest is read as a buffer.
+  main = None
+  for l in str(manifest).split('\n'):
     l = l.strip()
     if ':' not in l: continue
     parts = l.split(':')
-    if parts[0].strip() != 'Main-Class': continue
-    return parts[1].strip()
-
-def FindFile(className):
-  className = className.replace('.', '/')
-  className += '.class'
-  if className in namelist:
-    return className
-
-def ReadConstant(data):
-  tag = ord(data[0])
-  length = 0
+    # A fat jar's Main-Class is its launcher, which runs the Start-Class.
+    if parts[0].strip() == 'Start-Class':
+      return parts[1].strip()
+    if parts[0].strip() == 'Main-Class':
+      main = parts[1].strip()
+  return main
+
+def ReadConstant(data, offset):
+  tag = ord(data[offset])
   if tag == 1:
-    length = struct.unpack('>H', data[1:3])[0]
-    string = data[3:3 + length]
+    length = U2.unpack_from(data, offset + 1)[0]
+    string = data[offset + 3:offset + 3 + length].tobytes()
     return Constant('str', string), 1, 3 + length
   elif tag == 5:
-    value = struct.unpack('>q', data[1:9])[0]
+    value = S8.unpack_from(data, offset + 1)[0]
     return Constant('long', value), 2, 9
   elif tag == 6:
-    value = struct.unpack('>d', data[1:9])[0]
+    value = F8.unpack_from(data, offset + 1)[0]
     return Constant('double', value), 2, 9
   elif tag == 3:
-    value = struct.unpack('>i', data[1:5])[0]
+    value = S4.unpack_from(data, offset + 1)[0]
     return Constant('int', value), 1, 5
   elif tag == 4:
-    value = struct.unpack('>f', data[1:5])[0]
+    value = F4.unpack_from(data, offset + 1)[0]
     return Constant('float', value), 1, 5
   elif tag == 9:
-    v1, v2 = struct.unpack('>HH', data[1:5])
-    return Constant('fieldref', (v1, v2)), 1, 5
+    return Constant('fieldref', U2U2.unpack_from(data, offset + 1)), 1, 5
   elif tag == 10:
-    v1, v2 = struct.unpack('>HH', data[1:5])
-    return Constant('methodref', (v1, v2)), 1, 5
+    return Constant('methodref', U2U2.unpack_from(data, offset + 1)), 1, 5
   elif tag == 11:
-    v1, v2 = struct.unpack('>HH', data[1:5])
-    return Constant('interfacemethodref', (v1, v2)), 1, 5
+    return Constant('interfacemethodref', U2U2.unpack_from(data, offset + 1)), \
+        1, 5
   elif tag == 12:
-    v1, v2 = struct.unpack('>HH', data[1:5])
-    return Constant('nametypedescriptor', (v1, v2)), 1, 5
+    return Constant('nametypedescriptor', U2U2.unpack_from(data, offset + 1)), \
+        1, 5
   elif tag == 7:
-    value = struct.unpack('>H', data[1:3])[0]
+    value = U2.unpack_from(data, offset + 1)[0]
     return Constant('classref', value), 1, 3
   elif tag == 8:
-    value = struct.unpack('>H', data[1:3])[0]
+    value = U2.unpack_from(data, offset + 1)[0]
     return Constant('stringref', value), 1, 3
+  elif tag == 15:
+    # (reference kind, reference index)
+    return Constant('methodhandle', U1U2.unpack_from(data, offset + 1)), 1, 4
+  elif tag == 16:
+    value = U2.unpack_from(data, offset + 1)[0]
+    return Constant('methodtype', value), 1, 3
+  elif tag == 17:
+    # (bootstrap method index, name and type index)
+    return Constant('dynamic', U2U2.unpack_from(data, offset + 1)), 1, 5
+  elif tag == 18:
+    return Constant('invokedynamic', U2U2.unpack_from(data, offset + 1)), 1, 5
+  elif tag == 19:
+    value = U2.unpack_from(data, offset + 1)[0]
+    return Constant('module', value), 1, 3
+  elif tag == 20:
+    value = U2.unpack_from(data, offset + 1)[0]
+    return Constant('package', value), 1, 3
+
+def ShallowParse(data):
+  """Reads a class file's superclass and constructor descriptors only.
+
+  For classes that reference nothing in Guice, that is all the lint needs:
+  whether Guice can construct one with no arguments and where to look for
+  injected fields further up. The constant pool is only skipped over.
+  """
+  count = U2.unpack_from(data, 8)[0]
+  offset = 10
+  # Constant index -> offset of each string and class name index.
+  strings = {}
+  classes = {}
+  i = 1
+  while i < count:
+    tag = ord(data[offset])
+    if tag == 1:
+      strings[i] = offset
+      offset += 3 + U2.unpack_from(data, offset + 1)[0]
+    else:
+      if tag == 7:
+        classes[i] = U2.unpack_from(data, offset + 1)[0]
+      elif tag == 5 or tag == 6:
+        i += 1
+      offset += 1 + CONSTANT_SIZES[tag]
+    i += 1
+
+  def String(index):
+    start = strings[index]
+    return data[start + 3:start + 3 + U2.unpack_from(data, start + 1)[0]]
+
+  _, _, superIndex, interfaceCount = U2X4.unpack_from(data, offset)
+  offset += U2X4.size + 2 * interfaceCount
+  constructors = []
+  for members in ('fields', 'methods'):
+    memberCount = U2.unpack_from(data, offset)[0]
+    offset += 2
+    for _ in xrange(memberCount):
+      _, nameIndex, descriptorIndex, attributeCount = U2X4.unpack_from(
+          data, offset)
+      offset += U2X4.size
+      for _ in xrange(attributeCount):
+        offset += 6 + U2U4.unpack_from(data, offset)[1]
+      if members == 'methods' and String(nameIndex) == '<init>':
+        constructors.append(String(descriptorIndex))
+  superName = None
+  if superIndex:
+    superName = String(classes[superIndex])
+  return ShallowClass(superName, constructors)
 
 def Disassemble(data):
   """Number 5 alive."""
   ops = []
-  d = data
   addr = 0
-  while d:
-    op, skip = ReadOpcode(d, addr)
+  end = len(data)
+  while addr < end:
+    op, skip = ReadOpcode(data, addr)
     ops.append(op)
-    d = d[skip:]
     addr += skip
   return tuple(ops)
 
 def ReadOpcode(data, addr):
-  opcode = ord(data[0])
+  opcode = ord(data[addr])
   op = opcodeTable[opcode](data, addr)
   return op, op.size
 
 
+class LazyCode(object):
+  """Stands in for a method's Code until one of its fields is read.
+
+  Holds the Code attribute's bytes (a view into the class file buffer) and
+  only disassembles them on first access, so classes that are inspected just
+  for annotations or descriptors never pay for it.
+  """
+  __slots__ = ('classFile', 'info', 'decoded', 'callSites', 'facts')
+
+  def __init__(self, classFile, info):
+    self.classFile = classFile
+    self.info = info
+    self.decoded = None
+    self.callSites = None
+    # The method's analysis results; see JavaClassFile.Facts.
+    self.facts = None
+
+  def __getattr__(self, name):
+    if self.decoded is None:
+      classFile = self.classFile
+      self.decoded = classFile.ReadCode(self.info)
+      if classFile.profile is not None:
+        classFile.profile.Count('instructions decoded',
+                                len(self.decoded.code))
+      self.classFile = None
+      self.info = None
+    return getattr(self.decoded, name)
+
+  def CallSites(self):
+    """Returns the call sites and their predecessors (see opcodes.ScanCalls).
+
+    Cheaper than decoding the whole method when only calls matter.
+    """
+    if self.decoded is not None:
+      return self.decoded.code
+    if self.callSites is None:
+      self.callSites = self.classFile.ScanCode(self.info)
+    return self.callSites
+
+
 class JavaClassFile(object):
+  # Profile to count decoding work in; see LintSession.
+  profile = None
+  # Attributes whose info is kept; see ReadAttributes.
+  retainedAttributes = RETAINED_ATTRIBUTES
+  # Whether the class file's bytes are the class's own rather than a view of
+  # a jar's mapping.
+  ownsData = False
+  # Bytes of retained attribute info.
+  retainedSize = 0
+  # Bytes of the class file the parsed class no longer holds on to.
+  droppedSize = 0
+
   def __init__(self, fileLike):
-    self.data = fileLike.read()
+    data = fileLike.read()
+    self.ownsData = isinstance(data, str)
+    self.data = memoryview(data)
+    self.offset = 0
     self.ReadHeader()
     self.ReadConstants()
+    poolSize = self.offset - HEADER.size
     self.ReadHeader2()
     self.ReadInterfaces()
     self.ReadFields()
     self.ReadMethods()
     self.ReadClassAttributes()
+    if self.ownsData:
+      # What is left is about the constant pool, as strings and tuples, and
+      # copies of the retained info; the class file itself is freed.
+      self.rawSize = poolSize + self.retainedSize
+      self.droppedSize = len(data) - self.retainedSize
+    else:
+      # Retained info are views into the mapping, which stays alive as
+      # long as any of them does.
+      self.rawSize = len(data)
 
   def ReadHeader(self):
-    headerBytes = self.data[:10]
-    self.data = self.data[10:]
-    assert headerBytes[:4] == '\xCA\xFE\xBA\xBE'
-    _, self.minor, self.major, self.constantPoolCount = \
-        struct.unpack('>iHHH', headerBytes)
+    magic, self.minor, self.major, self.constantPoolCount = \
+        HEADER.unpack_from(self.data, 0)
+    assert magic == 0xCAFEBABE
+    self.offset = HEADER.size
+
+  def Summarize(self):
+    """Returns the parsed class as plain tuples that marshal can serialize.
+
+    Retained attribute info is included, as is each method's call sites so a
+    restored class never has to scan its bytecode.
+    """
+    methods = []
+    for method in self.methods:
+      code = None
+      if method.code is not None:
+        sites = method.code.CallSites()
+        code = (sites.opcodes.tostring(), sites.offsets.tostring(),
+                sites.operands.tostring())
+      methods.append((method.accessFlags, method.nameIndex,
+                      method.descriptorIndex,
+                      self.SummarizeAttributes(method.attributes), code))
+    fields = [(field.accessFlags, field.nameIndex, field.descriptorIndex,
+               self.SummarizeAttributes(field.attributes))
+              for field in self.fields]
+    classAttributes, size = self.classAttributes
+    return (self.minor, self.major, self.accessFlags, self.classIndex,
+            self.superIndex, tuple(self.interfaces),
+            [c and tuple(c) for c in self.constants], fields, methods,
+            (self.SummarizeAttributes(classAttributes), size))
+
+  def SummarizeAttributes(self, attributes):
+    summary = []
+    for attribute in attributes:
+      info = None
+      if attribute.info is not None:
+        info = attribute.info.tobytes()
+      annotations = attribute.annotations
+      if annotations is not None:
+        annotations = [PlainAnnotation(a) for a in annotations]
+      parameterAnnotations = attribute.parameterAnnotations
+      if parameterAnnotations is not None:
+        parameterAnnotations = tuple(tuple(PlainAnnotation(a) for a in p)
+                                     for p in parameterAnnotations)
+      summary.append((attribute.index, info, annotations,
+                      parameterAnnotations, attribute.offset,
+                      attribute.length))
+    return summary
+
+  @classmethod
+  def FromSummary(cls, summary):
+    """Rebuilds a JavaClassFile from the output of Summarize."""
+    self = cls.__new__(cls)
+    (self.minor, self.major, self.accessFlags, self.classIndex,
+     self.superIndex, interfaces, constants, fields, methods,
+     (classAttributes, size)) = summary
+    self.interfaces = list(interfaces)
+    self.interfaceCount = len(self.interfaces)
+    self.constants = [c and Constant(*c) for c in constants]
+    self.constantPoolCount = len(self.constants)
+    self.rawSize = sum(len(c.value) for c in self.constants
+                       if c is not None and c.type == 'str')
+    self.callNames = None
+    self.callDescriptors = None
+    # The methodrefs of getInstance; see methodvisitor.Interpreted.
+    self.getInstanceRefs = None
+    self.IndexClasses([i for i, c in enumerate(self.constants)
+                       if c is not None and c.type == 'classref'])
+    self.fields = [Field(accessFlags, nameIndex, descriptorIndex,
+                         RestoreAttributes(attributes))
+                   for accessFlags, nameIndex, descriptorIndex, attributes
+                   in fields]
+    self.fieldCount = len(self.fields)
+    self.namedMethods = {}
+    self.methods = []
+    for accessFlags, nameIndex, descriptorIndex, attributes, sites in methods:
+      attributes = RestoreAttributes(attributes)
+      code = None
+      for attribute in attributes:
+        if self.constants[attribute.index].value == 'Code':
+          # The call sites look at the bytecode through the info.
+          self.rawSize += len(attribute.info)
+          code = LazyCode(self, attribute.info)
+          codeLength = CODE_HEADER.unpack_from(attribute.info, 0)[2]
+          code.callSites = InstructionStream(
+              attribute.info[8:8 + codeLength], array('B', sites[0]),
+              array('i', sites[1]), array('i', sites[2]))
+      self.AddMethod(Method(accessFlags, nameIndex, descriptorIndex,
+                            attributes, code))
+    self.methodCount = len(self.methods)
+    self.classAttributes = (RestoreAttributes(classAttributes), size)
+    return self
+
+  def EstimateSize(self):
+    """Returns roughly how many bytes of memory the parsed class holds.
+
+    Counts the bytes read plus a per-object allowance for the constants,
+    fields and methods built from them and for any code scanned or decoded
+    so far, with its bytecode unless that is a view of bytes counted already.
+    """
+    size = (CLASS_OVERHEAD + self.rawSize +
+            CONSTANT_OVERHEAD * len(self.constants) +
+            MEMBER_OVERHEAD * (len(self.fields) + len(self.methods)))
+    for method in self.methods:
+      code = method.code
+      if code is None:
+        continue
+      if code.callSites is not None:
+        size += StreamSize(code.callSites)
+      if code.decoded is not None:
+        size += StreamSize(code.decoded.code)
+    return size
+
   def ReadConstants(self):
     i = 1
     constants = [None]
     classes = []
+    data = self.data
+    offset = self.offset
     while i < self.constantPoolCount:
-      constant, slots, skip = ReadConstant(self.data)
+      constant, slots, skip = ReadConstant(data, offset)
       if constant[0] == 'classref':
         classes.append(i)
-      self.data = self.data[skip:]
+      offset += skip
       constants.append(constant)
       if slots == 2:
         constants.append(None)
       i += slots
+    self.offset = offset
     self.constants = constants
+    self.callNames = None
+    self.callDescriptors = None
+    # The methodrefs of getInstance; see methodvisitor.Interpreted.
+    self.getInstanceRefs = None
+    self.IndexClasses(classes)
+
+  def IndexClasses(self, classes):
     self.classes = {}
     for i in classes:
       self.classes[self.constants[self.constants[i].value].value] = i
 
   def ReadHeader2(self):
     self.accessFlags, self.classIndex, self.superIndex, self.interfaceCount = \
-        struct.unpack('>HHHH', self.data[:8])
-    self.data = self.data[8:]
+        U2X4.unpack_from(self.data, self.offset)
+    self.offset += U2X4.size
 
   def ReadInterfaces(self):
-    self.interfaces = []
-    for i in xrange(self.interfaceCount):
-      self.interfaces.append(struct.unpack('>H',
-          self.data[2 * i:2 * i + 2])[0])
-    self.data = self.data[self.interfaceCount * 2:]
+    self.interfaces = list(struct.unpack_from('>%dH' % self.interfaceCount,
+                                              self.data, self.offset))
+    self.offset += self.interfaceCount * 2
 
   def ReadFields(self):
-    self.fieldCount = struct.unpack('>H', self.data[:2])[0]
+    self.fieldCount = U2.unpack_from(self.data, self.offset)[0]
+    self.offset += 2
     self.fields = []
-    self.data = self.data[2:]
     for _ in xrange(self.fieldCount):
-      field, skip = self.ReadField(self.data)
+      field, skip = self.ReadField(self.data, self.offset)
       self.fields.append(field)
-      self.data = self.data[skip:]
+      self.offset += skip
 
   def ReadMethods(self):
     self.namedMethods = {}
-    self.methodCount = struct.unpack('>H', self.data[:2])[0]
-    self.data = self.data[2:]
+    self.methodCount = U2.unpack_from(self.data, self.offset)[0]
+    self.offset += 2
     self.methods = []
     for _ in xrange(self.methodCount):
-      method, skip = self.ReadMethod(self.data)
-      self.data = self.data[skip:]
-      method = self.FindCode(method)
-      name = self.constants[method.nameIndex].value
-      if name in self.namedMethods:
-        self.namedMethods[name].append(method)
-      else:
-        self.namedMethods[name] = [method]
-      self.methods.append(method)
+      method, skip = self.ReadMethod(self.data, self.offset)
+      self.offset += skip
+      self.AddMethod(self.FindCode(method))
+
+  def AddMethod(self, method):
+    name = self.constants[method.nameIndex].value
+    if name in self.namedMethods:
+      self.namedMethods[name].append(method)
+    else:
+      self.namedMethods[name] = [method]
+    self.methods.append(method)
 
   def ReadClassAttributes(self):
-    count = struct.unpack('>H', self.data[:2])[0]
-    self.classAttributes = self.ReadAttributes(self.data[2:], count)
+    count = U2.unpack_from(self.data, self.offset)[0]
+    self.classAttributes = self.ReadAttributes(self.data, self.offset + 2, count)
     del self.data
+    del self.offset
 
   def FindCode(self, method):
     code = None
     for attribute in method.attributes:
       constant = self.constants[attribute.index]
       if constant.value == 'Code':
-        code = self.ReadCode(attribute.info)
+        code = LazyCode(self, attribute.info)
         break
     return Method(method.accessFlags, method.nameIndex, method.descriptorIndex,
                   method.attributes, code)
-  def ReadAttributes(self, data, count):
-    offset = 0
+
+  def ReadAttributes(self, data, offset, count):
+    """Reads count attributes starting at data[offset].
+
+    Annotations are parsed. The info of retainedAttributes is kept, as a
+    memoryview into data if that is a jar's mapping and copied out of it
+    otherwise, so that the class file can be freed once parsed; every other
+    attribute keeps only its offset and length. Returns the attributes and
+    the number of bytes they occupied.
+    """
+    start = offset
     attributes = []
+    constants = self.constants
+    retained = self.retainedAttributes
     for _ in xrange(count):
-      index, count = struct.unpack('>HI', data[offset:offset + 6])
-      name = self.constants[index].value
-      info = data[offset + 6:offset + 6 + count]
-      offset += 6 + count
+      index, length = U2U4.unpack_from(data, offset)
+      name = constants[index].value
+      offset += 6
+      info = None
       annotations = None
       parameterAnnotations = None
-      if name == 'RuntimeVisibleAnnotations':
-        annotations = self.GetAnnotations(info)
+      if name in retained:
+        info = data[offset:offset + length]
+        if self.ownsData:
+          info = memoryview(info.tobytes())
+        self.retainedSize += length
+      elif name == 'RuntimeVisibleAnnotations':
+        annotations = self.GetAnnotations(data, offset)
       elif name == 'RuntimeVisibleParameterAnnotations':
-        parameterAnnotations = self.GetParameterAnnotations(info)
+        parameterAnnotations = self.GetParameterAnnotations(data, offset)
+      attributes.append(Attribute(index, info, annotations,
+                                  parameterAnnotations, offset, length))
+      offset += length
+    return attributes, offset - start
 
-      attributes.append(Attribute(index, info, annotations, parameterAnnotations))
-    return attributes, offset
-
-  def GetAnnotations(self, info):
-    numAnnotations = struct.unpack('>H', info[:2])[0]
-    info = info[2:]
+  def GetAnnotations(self, data, offset):
+    numAnnotations = U2.unpack_from(data, offset)[0]
+    offset += 2
     annotations = []
     for _ in xrange(numAnnotations):
-      annotation, skip = self.ReadAnnotation(info)
-      info = info[skip:]
+      annotation, skip = self.ReadAnnotation(data, offset)
+      offset += skip
       annotations.append(annotation)
     return annotations
 
-  def GetParameterAnnotations(self, info):
-    numParameters = ord(info[0])
-    info = info[1:]
+  def GetParameterAnnotations(self, data, offset):
+    numParameters = ord(data[offset])
+    offset += 1
     parameters = []
     for i in xrange(numParameters):
       annotations = []
-      numAnnotations = struct.unpack('>H', info[:2])[0]
-      info = info[2:]
+      numAnnotations = U2.unpack_from(data, offset)[0]
+      offset += 2
       for _ in xrange(numAnnotations):
-        annotation, skip = self.ReadAnnotation(info)
-        info = info[skip:]
+        annotation, skip = self.ReadAnnotation(data, offset)
+        offset += skip
         annotations.append(annotation)
       parameters.append(tuple(annotations))
     return tuple(parameters)
 
-  def ReadAnnotation(self, info):
-    typeIndex, numPairs = struct.unpack('>HH', info[:4])
+  def ReadAnnotation(self, data, offset):
+    typeIndex, numPairs = U2U2.unpack_from(data, offset)
     baseType = ParseBaseType(self.constants[typeIndex].value)
-    info = info[4:]
     pairs = []
     size = 4
     for _ in xrange(numPairs):
-      elementNameIndex = struct.unpack('>H', info[:2])[0]
+      elementNameIndex = U2.unpack_from(data, offset + size)[0]
       size += 2
-      info = info[2:]
-      value, skip = self.ReadElementValue(info)
-      info = info[skip:]
+      value, skip = self.ReadElementValue(data, offset + size)
       size += skip
       pairs.append((elementNameIndex, value))
     return Annotation(baseType, pairs), size
 
-  def ReadElementValue(self, info):
-    tag = info[0]
+  def ReadElementValue(self, data, offset):
+    tag = data[offset]
     if tag not in 'BCDFIJSZ@[ecs':
       exit("Parsing error: unknown tag %s (%d) found in elementValue" % (tag,
                                                                          ord(tag)))
     if tag == '@':
-      annotation, skip = self.ReadAnnotation(self, info[1:])
+      annotation, skip = self.ReadAnnotation(data, offset + 1)
       skip += 1
       return ((tag, annotation), skip)
     elif tag == '[':
       size = 3
-      numValues = struct.unpack('>H', info[1:3])[0]
-      info = info[3:]
+      numValues = U2.unpack_from(data, offset + 1)[0]
       values = []
       for _ in xrange(numValues):
-        value, skip = self.ReadElementValue(info)
-        info = info[skip:]
+        value, skip = self.ReadElementValue(data, offset + size)
         size += skip
         values.append(value)
       return ((tag, values), size)
     elif tag == 'e':
-      value = struct.unpack('>HH', info[1:5])
+      value = U2U2.unpack_from(data, offset + 1)
       return ((tag, value), 5)
-    value = struct.unpack('>H', info[1:3])[0]
+    value = U2.unpack_from(data, offset + 1)[0]
     return ((tag, value), 3)
 
-  def ReadField(self, data):
+  def ReadField(self, data, offset):
     accessFlags, nameIndex, descriptorIndex, attributesCount = \
-        struct.unpack('>HHHH', data[:8])
-    attributes, skip = self.ReadAttributes(data[8:], attributesCount)
+        U2X4.unpack_from(data, offset)
+    attributes, skip = self.ReadAttributes(data, offset + 8, attributesCount)
     return Field(accessFlags, nameIndex, descriptorIndex, attributes), skip + 8
 
-  def ReadMethod(self, data):
+  def ReadMethod(self, data, offset):
     accessFlags, nameIndex, descriptorIndex, attributesCount = \
-        struct.unpack('>HHHH', data[:8])
-    attributes, skip = self.ReadAttributes(data[8:], attributesCount)
+        U2X4.unpack_from(data, offset)
+    attributes, skip = self.ReadAttributes(data, offset + 8, attributesCount)
     return Method(accessFlags, nameIndex, descriptorIndex, attributes, None), skip + 8
 
   def ReadCode(self, attr):
-    maxStack, maxLocals, codeLength = struct.unpack('>HHI', attr[:8])
-    code = Disassemble(attr[8:8 + codeLength])
-    exceptionTableLength = struct.unpack('>H', attr[8 + codeLength: 10 +
-                                                    codeLength])[0]
+    maxStack, maxLocals, codeLength = CODE_HEADER.unpack_from(attr, 0)
+    bytecode = attr[8:8 + codeLength]
+    # Decoding a str is faster, but the copy is only needed while it lasts;
+    # the instructions keep a view of the bytes the Code attribute holds.
+    code = Decode(bytecode.tobytes())
+    code.data = bytecode
+    offset = 8 + codeLength
+    exceptionTableLength = U2.unpack_from(attr, offset)[0]
+    offset += 2
     exceptions = []
     for i in xrange(exceptionTableLength):
-      startPc, endPc, handlerPc, catchType = struct.unpack('>HHHH',
-          attr[10 + codeLength + i * 8:10 + codeLength + i * 8 + 8])
-      exceptions.append(JavaException(startPc, endPc, handlerPc, catchType))
-
-    attributesCount = struct.unpack('>H', attr[10 + codeLength + exceptionTableLength * 8:10 + codeLength + exceptionTableLength * 8 +
-                                               2])[0]
-    attributes = self.ReadAttributes(attr[10 + codeLength + exceptionTableLength * 8
-                                     + 2:], attributesCount)
-    return Code(maxStack, maxLocals, code, exceptions, attributes)
+      exceptions.append(JavaException._make(U2X4.unpack_from(attr, offset)))
+      offset += 8
 
-  def GetProvidersAndInjectors(self, method):
-    # Go 3 deep:
-    methodName = self.constants[method.nameIndex].value
-    classRef = self.constants[self.classIndex]
-    className = self.constants[classRef.value].value
-    calledMethods, injected = self.GetAllCalled([className + '.' + methodName])
-    fanout = [calledMethods]
-    while len(fanout) < 3:
-      newMethods, injectedClasses = self.GetAllCalled(fanout[-1])
-      fanout.append(newMethods)
-      injected += injectedClasses
-    allCalled = set()
-    for x in fanout:
-      allCalled = allCalled.union(set(x))
-    modules = self.FindModules(allCalled)
-    providers = self.FindAllProviders(modules)
-    newProviders, newInjected = self.FindAllBindings(modules)
-    providers += newProviders
-    injected += newInjected
-    newProviders, newInjected = InjectedTransitiveClosure(injected)
-    providers += newProviders
-    return providers, newInjected
+    attributesCount = U2.unpack_from(attr, offset)[0]
+    attributes = self.ReadAttributes(attr, offset + 2, attributesCount)
+    return Code(maxStack, maxLocals, code, exceptions, attributes)
 
-  def FindAllBindings(self, modules):
-    providers = []
-    injected = []
-    done = set()
-    while modules:
-      module = modules.pop()
-      if module in done:
-        continue
-      newProviders, newInjected, newModules = self.FindBindings(module)
-      providers += newProviders
-      providers += self.FindProviders(module)
-      modules += newModules
-      injected += newInjected
-      done.add(module)
-    return providers, injected
+  def ScanCode(self, attr):
+    """Returns the call sites in a Code attribute; see opcodes.ScanCalls."""
+    codeLength = CODE_HEADER.unpack_from(attr, 0)[2]
+    bytecode = attr[8:8 + codeLength]
+    # As in ReadCode, scan a copy but keep a view.
+    callSites = ScanCalls(bytecode.tobytes())
+    callSites.data = bytecode
+    if self.profile is not None:
+      self.profile.Count('call sites scanned', len(callSites))
+    return callSites
 
-  def FindBindings(self, module):
-    classFile = LoadClass(FindFile(module))
-    providers = []
-    injectors = []
-    newModules = []
-    for method in classFile.methods:
-      if classFile.constants[method.nameIndex].value != 'configure':
-        continue
-      prev = None
-      to = None
-      for op in method.code.code:
-        call = classFile.IsCall(op)
-        if call is not None:
-          if call.endswith('.install'):
-            modCall = classFile.IsCall(prev)
-            if modCall is not None:
-              if '.' in modCall:
-                modCall = modCall[:modCall.index('.')]
-              newModules.append(modCall)
-          if call.endswith('.bind'):
-            if str(prev).startswith('ldc'):
-              bind = classFile.constants[classFile.constants[prev.index].value].value
-          if call == 'com/google/inject/binder/AnnotatedBindingBuilder.to':
-            providers.append((bind, None))
-            if str(prev).startswith('ldc'):
-              to = classFile.constants[classFile.constants[prev.index].value].value
-              injectors.append((to, None))
-          if call == 'com/google/inject/binder/AnnotatedBindingBuilder.toInstance':
-            providers.append((bind, None))
-        prev = op
-    return providers, injectors, newModules
+  def Facts(self, method):
+    """Returns the methodvisitor analyses' results for method.
 
-  def FindAllProviders(self, modules):
-    providers = []
-    for module in modules:
-      providers += self.FindProviders(module)
-    return providers
+    The method is walked the first time and its facts kept with its code.
+    """
+    code = method.code
+    if code is None:
+      return NO_FACTS
+    if code.facts is None:
+      if Interpreted(self, self.constants[method.nameIndex].value, code):
+        code.facts = VisitMethod(self, code.code, self.profile, True)
+      else:
+        code.facts = VisitMethod(self, code.CallSites(), self.profile)
+    return code.facts
 
-  def FindProviders(self, module):
-    classFile = LoadClass(FindFile(module))
-    providers = []
-    for method in classFile.methods:
-      provides = None
-      named = None
-      for attribute in method.attributes:
-        if attribute.annotations is not None:
-          for annotation in attribute.annotations:
-            if annotation.typeIndex[0] == ('L', 'com/google/inject/Provides'):
-              provides = classFile.constants[method.descriptorIndex].value
-            elif annotation.typeIndex[0] == ('L', 'com/google/inject/name/Named'):
-              named = classFile.constants[annotation.pairs[0][1][1]].value
-      if provides is not None:
-        provides = GetReturnType(provides)
-        providers.append((provides, named))
-    return providers
+  def CallNames(self):
+    """Returns a dict from methodref constant index to 'owner.name'."""
+    if self.callNames is None:
+      self.ResolveCallTargets()
+    return self.callNames
 
-  def FindModules(self, methodNames):
-    modules = []
-    for methodName in methodNames:
-      fname, mname = methodName.split('.')
-      f = FindFile(fname)
-      if not f:
-        continue
-      otherClass = LoadClass(FindFile(fname))
-      if mname not in otherClass.namedMethods:
-        continue
-      superClass = otherClass.constants[otherClass.constants[otherClass.superIndex].value].value
-      if superClass == 'com/google/inject/AbstractModule':
-        modules.append(fname)
-    return modules
+  def ResolveCallTargets(self):
+    """Maps every methodref constant to its 'owner.name' and descriptor.
 
-  def GetAllCalled(self, methodNames):
-    called = []
-    injected = []
-    for methodName in methodNames:
-      fname, mname = methodName.split('.')
-      f = FindFile(fname)
-      if not f:
+    The names are interned, so the same target called from many classes is
+    stored and compared as a single string.
+    """
+    constants = self.constants
+    self.callNames = {}
+    self.callDescriptors = {}
+    for index, c in enumerate(constants):
+      if c is None or c.type not in ('methodref', 'interfacemethodref'):
         continue
-      otherClass = LoadClass(FindFile(fname))
-      if mname not in otherClass.namedMethods:
-        continue
-      otherMethods = otherClass.namedMethods[mname]
-      for otherMethod in otherMethods:
-        newCalled = otherClass.GetCalled(otherMethod)
-        if 'com/google/inject/Injector.getInstance' in newCalled:
-          injected += otherClass.GetInjected(otherMethod)
-        called += newCalled
-    return called, injected
-
-  def GetInjected(self, method):
-    injected = []
-    prev = None
-    for x in method.code.code:
-      c = self.IsCall(x)
-      if c == 'com/google/inject/Injector.getInstance':
-        if str(prev).startswith('ldc'):
-          injected.append((self.constants[self.constants[prev.index].value].value,
-                           None))
-      prev = x
-    return injected
-
-  def GetCalled(self, method):
-    called = []
-    if not method.code:
-      return called
-    for x in method.code.code:
-      c = self.IsCall(x)
-      if c:
-        called.append(c)
-    return called
-
-  def IsCall(self, x):
-    if str(x).startswith('invoke'):
-      c = self.constants[x.index]
-      classRef = self.constants[c.value[0]]
-      calling = self.constants[classRef.value].value
-      calling += '.'
-      descRef = self.constants[c.value[1]]
-      name = self.constants[descRef.value[0]]
-      calling += name.value
-      type = self.constants[descRef.value[1]]
-      return calling
+      classRef = constants[c.value[0]]
+      descRef = constants[c.value[1]]
+      self.callNames[index] = intern(constants[classRef.value].value + '.' +
+                                     constants[descRef.value[0]].value)
+      self.callDescriptors[index] = constants[descRef.value[1]].value
   def FindClass(self, className):
     if className not in self.classes:
       return None
     return self.classes[className]
 
+def PlainAnnotation(annotation):
+  """Converts an Annotation to nested plain tuples and lists."""
+  return (annotation.typeIndex,
+          [(name, PlainElementValue(value)) for name, value in annotation.pairs])
+
+def PlainElementValue(elementValue):
+  tag, value = elementValue
+  if tag == '@':
+    return (tag, PlainAnnotation(value))
+  elif tag == '[':
+    return (tag, [PlainElementValue(v) for v in value])
+  return elementValue
+
+def RestoreAnnotation(plain):
+  typeIndex, pairs = plain
+  return Annotation(typeIndex, [(name, RestoreElementValue(value))
+                                for name, value in pairs])
+
+def RestoreElementValue(elementValue):
+  tag, value = elementValue
+  if tag == '@':
+    return (tag, RestoreAnnotation(value))
+  elif tag == '[':
+    return (tag, [RestoreElementValue(v) for v in value])
+  return elementValue
+
+def StreamSize(stream):
+  """Estimates the memory an InstructionStream holds on to.
+
+  Its bytecode only counts if it is a copy rather than a view of an info.
+  """
+  size = INSTRUCTION_OVERHEAD * len(stream)
+  if not isinstance(stream.data, memoryview):
+    size += len(stream.data)
+  return size
+
+def RestoreAttributes(summary):
+  attributes = []
+  for (index, info, annotations, parameterAnnotations, offset,
+       length) in summary:
+    if info is not None:
+      info = memoryview(info)
+    if annotations is not None:
+      annotations = [RestoreAnnotation(a) for a in annotations]
+    if parameterAnnotations is not None:
+      parameterAnnotations = tuple(tuple(RestoreAnnotation(a) for a in p)
+                                   for p in parameterAnnotations)
+    attributes.append(Attribute(index, info, annotations,
+                                parameterAnnotations, offset, length))
+  return attributes
+
 def GetReturnType(s):
   returnType = ParseBaseType(s[s.index(')') + 1:])
   return BaseTypeClass(returnType[0])
@@ -577,87 +1515,6 @@ def ParseBaseType(s):
     return (tag, None), 1
 
 
-def InjectedTransitiveClosure(injected):
-  newClasses = []
-  providers = []
-  done = set()
-  todo = injected[:]
-  while todo:
-    className, name = todo.pop()
-    if (className, name) in done:
-      continue
-    done.add((className, name))
-    newClasses.append((className, name))
-    fname = FindFile(className)
-    if not fname:
-      continue
-    classFile = LoadClass(fname)
-    classRef = classFile.FindClass(className)
-    if classRef is None: continue
-    foundAnnotation = False
-    for method in classFile.methods:
-      methodName = classFile.constants[method.nameIndex].value
-      if methodName != '<init>':
-        continue
-      # Guice will inject argument-less constructurs.
-      if classFile.constants[method.descriptorIndex].value == '()V':
-        providers.append((className, None))
-        break
-
-      methodAnnotations = None
-      parameterAnnotations = None
-      for attribute in method.attributes:
-        if attribute.parameterAnnotations is not None:
-          parameterAnnotations = attribute.parameterAnnotations
-        if attribute.annotations is not None:
-          methodAnnotations = attribute.annotations
-        if parameterAnnotations is not None and methodAnnotations is not None:
-          break
-      if methodAnnotations is not None:
-        for annotation in methodAnnotations:
-          if annotation.typeIndex[0][1] == 'com/google/inject/Inject':
-            foundAnnotation = True
-            providers.append((className, None))
-            argClasses = GetArgumentClasses(classFile.constants[method.descriptorIndex].value, parameterAnnotations, classFile)
-            # Don't include Injector, etc.
-            argClasses = [x for x in argClasses if not x[0].startswith('com/google/inject')]
-            # TODO(cswenson): Read annotations for @Named in arguments.
-            newClasses += argClasses
-            todo += argClasses
-            break
-    if not foundAnnotation:
-      continue
-    # Check fields for @Inject, and for superclasses.
-    newClasses += FindInjectedFields(className)
-    todo += newClasses
-
-  return providers, newClasses
-
-def FindInjectedFields(className):
-  classFile = LoadClass(FindFile(className))
-  needed = []
-  for field in classFile.fields:
-    for attribute in field.attributes:
-      if attribute.annotations is None:
-        continue
-      bind = None
-      named = None
-      for annotation in attribute.annotations:
-        if annotation.typeIndex[0][1] == 'com/google/inject/Inject':
-          desc = classFile.constants[field.descriptorIndex].value
-          bind = ParseBaseType(desc)[0][1]
-          needed.append((bind, None))
-        elif annotation.typeIndex[0] == ('L', 'com/google/inject/name/Named'):
-          named = classFile.constants[annotation.pairs[0][1][1]].value
-          needed[-1] = (bind, named)
-  superClass = classFile.constants[classFile.constants[classFile.superIndex].value].value
-  if superClass.startswith('java'):
-    return needed
-  needed += FindInjectedFields(superClass)
-  return needed
-
-
 
 if __name__ == '__main__':
-  import sys
   main(sys.argv)
@@ -0,0 +1,592 @@
+# Copyright 2026 The guicelint Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Checks what guice_lint finds on jars with known bindings and injections.
+
+Usage: python guice_lint_test.py
+
+The app jar is written with classwriter. Its module binds Foo with
+bind().to() and @Named("x") String through a local, which only the
+interpreter follows; its main looks up Foo, a Key for @Named("y") String
+and a class missing from the jar. Every way of loading classes, serial,
+--jobs, the parse cache, a class directory or a fat jar, has to find the
+same two unresolved keys.
+"""
+
+import io
+import os
+import shutil
+import SocketServer
+import struct
+import tempfile
+import threading
+import unittest
+import zipfile
+
+import guice_lint
+import jargen
+import lintclient
+import lintdaemon
+import methodvisitor
+import opcodes
+from classcache import ClassCache
+from classpath import JarContainer
+from classwriter import ACC_PUBLIC
+from classwriter import ACC_STATIC
+from classwriter import ClassWriter
+from parsecache import ParseCache
+
+ABSTRACT_MODULE = 'com/google/inject/AbstractModule'
+ANNOTATED_BUILDER = 'com/google/inject/binder/AnnotatedBindingBuilder'
+LINKED_BUILDER = 'com/google/inject/binder/LinkedBindingBuilder'
+SCOPED_BUILDER = 'com/google/inject/binder/ScopedBindingBuilder'
+INJECTOR = 'com/google/inject/Injector'
+INJECT = 'com/google/inject/Inject'
+PROVIDES = 'com/google/inject/Provides'
+NAMED = 'com/google/inject/name/Named'
+
+# What the app jar leaves unresolved.
+UNRESOLVED = set([('app/Missing', None), ('java/lang/String', 'y')])
+
+
+def Invoke(opcode, index):
+  if opcode == 0xb9:
+    # invokeinterface also takes the argument count, here 2 slots or fewer.
+    return struct.pack('>BHBB', opcode, index, 2, 0)
+  return struct.pack('>BH', opcode, index)
+
+
+def Ldc(constant):
+  return struct.pack('>BH', 0x13, constant)
+
+
+def Named(w, name):
+  """Pushes Names.named(name)."""
+  return Ldc(w.String(name)) + Invoke(0xb8, w.Methodref(
+      'com/google/inject/name/Names', 'named',
+      '(Ljava/lang/String;)L%s;' % NAMED))
+
+
+def AppClasses():
+  """Returns {entry name: bytes} of the app's classes."""
+  classes = {}
+
+  w = ClassWriter('app/Main')
+  getInstance = w.InterfaceMethodref(INJECTOR, 'getInstance',
+                                     '(Ljava/lang/Class;)Ljava/lang/Object;')
+  getKey = w.InterfaceMethodref(
+      INJECTOR, 'getInstance', '(Lcom/google/inject/Key;)Ljava/lang/Object;')
+  keyGet = w.Methodref('com/google/inject/Key', 'get',
+                       '(Ljava/lang/Class;Ljava/lang/annotation/Annotation;)'
+                       'Lcom/google/inject/Key;')
+  code = (struct.pack('>BH', 0xbb, w.Class('app/MyModule')) + '\x59' +
+          Invoke(0xb7, w.Methodref('app/MyModule', '<init>', '()V')) +
+          Invoke(0xb8, w.Methodref(
+              'com/google/inject/Guice', 'createInjector',
+              '(Lcom/google/inject/Module;)L%s;' % INJECTOR)) +
+          '\x4c' +
+          # injector.getInstance(Foo.class)
+          '\x2b' + w.LoadClassConstant('app/Foo') +
+          Invoke(0xb9, getInstance) + '\x57' +
+          # injector.getInstance(Key.get(String.class, Names.named("y")))
+          '\x2b' + w.LoadClassConstant('java/lang/String') + Named(w, 'y') +
+          Invoke(0xb8, keyGet) + Invoke(0xb9, getKey) + '\x57' +
+          # injector.getInstance(Missing.class)
+          '\x2b' + w.LoadClassConstant('app/Missing') +
+          Invoke(0xb9, getInstance) + '\x57' + '\xb1')
+  w.AddMethod('main', '([Ljava/lang/String;)V', code,
+              accessFlags=ACC_PUBLIC | ACC_STATIC)
+  w.AddMethod('helper', '()V', '\x03\x3b\x1a\x57\xb1',
+              accessFlags=ACC_PUBLIC | ACC_STATIC)
+  classes['app/Main.class'] = w.ToBytes()
+
+  w = ClassWriter('app/MyModule', ABSTRACT_MODULE)
+  jargen.Constructor(w, ABSTRACT_MODULE)
+  bind = w.Methodref('app/MyModule', 'bind',
+                     '(Ljava/lang/Class;)L%s;' % ANNOTATED_BUILDER)
+  code = (
+      # bind(Foo.class).to(FooImpl.class)
+      '\x2a' + w.LoadClassConstant('app/Foo') + Invoke(0xb6, bind) +
+      w.LoadClassConstant('app/FooImpl') +
+      Invoke(0xb9, w.InterfaceMethodref(
+          ANNOTATED_BUILDER, 'to',
+          '(Ljava/lang/Class;)L%s;' % SCOPED_BUILDER)) + '\x57' +
+      # Named x = Names.named("x");
+      # bind(String.class).annotatedWith(x).toInstance("hello")
+      Named(w, 'x') + '\x4c' +
+      '\x2a' + w.LoadClassConstant('java/lang/String') + Invoke(0xb6, bind) +
+      '\x2b' + Invoke(0xb9, w.InterfaceMethodref(
+          ANNOTATED_BUILDER, 'annotatedWith',
+          '(Ljava/lang/annotation/Annotation;)L%s;' % LINKED_BUILDER)) +
+      Ldc(w.String('hello')) +
+      Invoke(0xb9, w.InterfaceMethodref(LINKED_BUILDER, 'toInstance',
+                                        '(Ljava/lang/Object;)V')) + '\xb1')
+  w.AddMethod('configure', '()V', code)
+  w.AddMethod('provideBar', '()Lapp/Bar;', '\x01\xb0',
+              annotations=[(PROVIDES, None)])
+  classes['app/MyModule.class'] = w.ToBytes()
+
+  classes['app/Foo.class'] = jargen.Interface('app/Foo')
+  w = ClassWriter('app/FooImpl')
+  jargen.Constructor(w, 'java/lang/Object', '(Lapp/Bar;Ljava/lang/String;)V',
+                     annotations=[(INJECT, None)],
+                     parameterAnnotations=[[], [(NAMED, 'x')]])
+  w.AddField('baz', 'Lapp/Baz;', annotations=[(INJECT, None)])
+  classes['app/FooImpl.class'] = w.ToBytes()
+  w = ClassWriter('app/Baz')
+  jargen.Constructor(w, 'java/lang/Object')
+  classes['app/Baz.class'] = w.ToBytes()
+  return classes
+
+
+def WriteJar(path, entries, compression=zipfile.ZIP_DEFLATED):
+  z = zipfile.ZipFile(path, 'w', compression, allowZip64=True)
+  try:
+    for name in sorted(entries):
+      z.writestr(name, entries[name])
+  finally:
+    z.close()
+
+
+def Lint(paths, mainClass='app.Main', **kwargs):
+  session = guice_lint.LintSession(paths, **kwargs)
+  try:
+    return session.Lint(mainClass)
+  finally:
+    session.Close()
+
+
+class ScanCallsTest(unittest.TestCase):
+  """ScanCalls keeps what Decode reads for calls and their predecessors."""
+
+  def testMatchesDecode(self):
+    code = (
+        # wide aload 300; invokevirtual #5
+        '\xc4\x19\x01\x2c' + Invoke(0xb6, 5) +
+        # iconst_0; tableswitch 0..1 at 8, padded by 3; invokestatic #6
+        '\x03\xaa\x00\x00\x00' + struct.pack('>iii', 20, 0, 1) +
+        struct.pack('>ii', 20, 20) + Invoke(0xb8, 6) +
+        # nop x3; iconst_0; lookupswitch {7: ...} at 39, unpadded;
+        # invokeinterface #7
+        '\x00\x00\x00\x03\xab' + struct.pack('>iiii', 16, 1, 7, 16) +
+        Invoke(0xb9, 7) +
+        # ldc #8; invokespecial #9; return
+        Ldc(8) + Invoke(0xb7, 9) + '\xb1')
+    decoded = opcodes.Decode(code)
+    scanned = opcodes.ScanCalls(code)
+    entries = dict((decoded.offsets[i], (decoded.opcodes[i],
+                                         decoded.operands[i]))
+                   for i in xrange(len(decoded)))
+    self.assertEqual(8, len(scanned))
+    for i in xrange(len(scanned)):
+      self.assertEqual(entries[scanned.offsets[i]],
+                       (scanned.opcodes[i], scanned.operands[i]))
+    self.assertEqual([300, 5, 20, 6, 16, 7, 8, 9], list(scanned.operands))
+
+
+class ClassCacheTest(unittest.TestCase):
+  """Eviction order and the room estimate of the class cache."""
+
+  def testEvictsLeastRecentlyUsedByBytes(self):
+    cache = ClassCache(maxBytes=30)
+    for name in 'abc':
+      cache.Put(name, name.upper(), 10)
+    self.assertEqual('A', cache.Get('a'))
+    cache.Put('d', 'D', 10)
+    self.assertEqual(None, cache.Get('b'))
+    self.assertEqual(['c', 'a', 'd'], list(cache.entries))
+    self.assertEqual(30, cache.size)
+    self.assertEqual(1, cache.evictions)
+
+  def testEvictsByEntries(self):
+    cache = ClassCache(maxEntries=2)
+    for name in 'abc':
+      cache.Put(name, name.upper(), 1000)
+    self.assertEqual(['b', 'c'], list(cache.entries))
+
+  def testKeepsOversizedNewestClass(self):
+    cache = ClassCache(maxBytes=10)
+    cache.Put('a', 'A', 5)
+    cache.Put('b', 'B', 50)
+    self.assertEqual(['b'], list(cache.entries))
+    self.assertEqual(50, cache.size)
+
+  def testReplacingKeepsSizeRight(self):
+    cache = ClassCache()
+    cache.Put('a', 'A', 10)
+    cache.Put('a', 'A2', 20)
+    self.assertEqual(1, len(cache))
+    self.assertEqual(20, cache.size)
+
+  def testRoom(self):
+    self.assertEqual(None, ClassCache().Room())
+    self.assertEqual(7, ClassCache(maxEntries=7).Room())
+    cache = ClassCache(maxBytes=1000)
+    self.assertEqual(1000, cache.Room())
+    cache.Put('a', 'A', 100)
+    cache.Put('b', 'B', 300)
+    self.assertEqual(5, cache.Room())
+    cache = ClassCache(maxBytes=1000, maxEntries=3)
+    cache.Put('a', 'A', 100)
+    self.assertEqual(3, cache.Room())
+
+
+class AnalysisTest(unittest.TestCase):
+  """The facts of single methods, with and without the interpreter."""
+
+  def setUp(self):
+    classes = AppClasses()
+    self.main = guice_lint.JavaClassFile(
+        guice_lint.EntryFile(classes['app/Main.class']))
+    self.module = guice_lint.JavaClassFile(
+        guice_lint.EntryFile(classes['app/MyModule.class']))
+
+  def Facts(self, classFile, methodName, interpret):
+    code = classFile.namedMethods[methodName][0].code
+    if interpret:
+      return methodvisitor.VisitMethod(classFile, code.code, None, True)
+    return methodvisitor.VisitMethod(classFile, code.CallSites())
+
+  def testDynamicConstants(self):
+    w = ClassWriter('app/Lambdas')
+    nameAndType = w.NameAndType('get', '()Ljava/util/function/Supplier;')
+    make = w.Methodref('app/Lambdas', 'make', '()V')
+    handle = w.AddConstant(('methodhandle',),
+                           struct.pack('>BBH', 15, 6, make))
+    w.AddConstant(('methodtype',), struct.pack('>BH', 16, w.Utf8('()V')))
+    w.AddConstant(('dynamic',), struct.pack('>BHH', 17, 0, nameAndType))
+    indy = w.AddConstant(('invokedynamic',),
+                         struct.pack('>BHH', 18, 0, nameAndType))
+    w.AddConstant(('module',), struct.pack('>BH', 19, w.Utf8('app')))
+    w.AddConstant(('package',), struct.pack('>BH', 20, w.Utf8('app')))
+    # Supplier s = () -> ...; then Names.named("x")
+    code = (struct.pack('>BHBB', 0xba, indy, 0, 0) + '\x4c' + Named(w, 'x') +
+            '\x57\xb1')
+    w.AddMethod('main', '([Ljava/lang/String;)V', code,
+                accessFlags=ACC_PUBLIC | ACC_STATIC)
+    data = w.ToBytes()
+    classFile = guice_lint.JavaClassFile(guice_lint.EntryFile(data))
+    types = [c.type for c in classFile.constants if c is not None]
+    for expected in ('methodhandle', 'methodtype', 'dynamic', 'invokedynamic',
+                     'module', 'package'):
+      self.assertTrue(expected in types)
+    self.assertEqual((6, make), classFile.constants[handle].value)
+    self.assertEqual('java/lang/Object',
+                     guice_lint.ShallowParse(data).superName)
+    for interpret in (False, True):
+      self.Facts(classFile, 'main', interpret)
+    summary = classFile.Summarize()
+    self.assertEqual(classFile.constants,
+                     guice_lint.JavaClassFile.FromSummary(summary).constants)
+
+  def testBytecodeIsOnlyHeldByItsInfo(self):
+    restored = guice_lint.JavaClassFile.FromSummary(self.main.Summarize())
+    for classFile in (self.main, restored):
+      code = classFile.namedMethods['main'][0].code
+      self.assertTrue(isinstance(code.CallSites().data, memoryview))
+      self.assertTrue(isinstance(code.code.data, memoryview))
+
+  def testHeuristicBindings(self):
+    providers, injected, _ = self.Facts(self.module, 'configure',
+                                        False)['bindings']
+    self.assertEqual([('app/Foo', None)], providers)
+    self.assertEqual([('app/FooImpl', None)], injected)
+
+  def testInterpretedBindings(self):
+    providers, injected, _ = self.Facts(self.module, 'configure',
+                                        True)['bindings']
+    self.assertEqual([('app/Foo', None), ('java/lang/String', 'x')],
+                     providers)
+    self.assertEqual([('app/FooImpl', None)], injected)
+
+  def testHeuristicGetInstance(self):
+    self.assertEqual([('app/Foo', None), ('app/Missing', None)],
+                     self.Facts(self.main, 'main', False)['injected'])
+
+  def testInterpretedGetInstance(self):
+    self.assertEqual([('app/Foo', None), ('java/lang/String', 'y'),
+                      ('app/Missing', None)],
+                     self.Facts(self.main, 'main', True)['injected'])
+
+  def testInterpretsOnlyMethodsThatNeedIt(self):
+    for methodName, interpreted in (('main', True), ('helper', False)):
+      code = self.main.namedMethods[methodName][0].code
+      self.assertEqual(interpreted, methodvisitor.Interpreted(
+          self.main, methodName, code))
+    code = self.module.namedMethods['configure'][0].code
+    self.assertTrue(methodvisitor.Interpreted(self.module, 'configure', code))
+
+
+class LintTest(unittest.TestCase):
+  """Whole lints, which must agree however classes are loaded."""
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.classes = AppClasses()
+    self.entries = dict(self.classes)
+    self.entries['META-INF/MANIFEST.MF'] = (
+        'Manifest-Version: 1.0\nMain-Class: app.Main\n')
+    self.jar = self.Path('app.jar')
+    WriteJar(self.jar, self.entries)
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def Path(self, name):
+    return os.path.join(self.directory, name)
+
+  def testSerial(self):
+    self.assertEqual(UNRESOLVED, Lint([self.jar]))
+
+  def testMissingMainClass(self):
+    self.assertRaises(guice_lint.MainClassError, Lint, [self.jar], 'app.Nope')
+
+  def testStored(self):
+    jar = self.Path('stored.jar')
+    WriteJar(jar, self.entries, zipfile.ZIP_STORED)
+    self.assertEqual(UNRESOLVED, Lint([jar]))
+
+  def testZip64(self):
+    jar = self.Path('zip64.jar')
+    # Make zipfile give every size, offset and the end record a ZIP64 field.
+    limit = zipfile.ZIP64_LIMIT
+    zipfile.ZIP64_LIMIT = 0
+    try:
+      WriteJar(jar, self.entries)
+    finally:
+      zipfile.ZIP64_LIMIT = limit
+    z = zipfile.ZipFile(jar)
+    container = JarContainer(jar)
+    try:
+      self.assertEqual(sorted(z.namelist()), sorted(container.Names()))
+      for info in z.infolist():
+        self.assertEqual(z.read(info.filename),
+                         str(container.Read(info.filename)))
+        self.assertEqual((info.CRC, info.file_size),
+                         container.CacheKey(info.filename))
+    finally:
+      z.close()
+      container.Close()
+    self.assertEqual(UNRESOLVED, Lint([jar]))
+
+  def testJobs(self):
+    self.assertEqual(UNRESOLVED, Lint([self.jar], jobs=2))
+
+  def testInflateThreads(self):
+    self.assertEqual(UNRESOLVED, Lint([self.jar], inflateThreads=2))
+
+  def testParseCache(self):
+    parseCache = ParseCache(self.Path('cache'), guice_lint.PARSER_VERSION)
+    self.assertEqual(UNRESOLVED, Lint([self.jar], parseCache=parseCache))
+    self.assertEqual(0, parseCache.hits)
+    self.assertEqual(UNRESOLVED, Lint([self.jar], parseCache=parseCache))
+    self.assertEqual(parseCache.misses, parseCache.hits)
+    self.assertEqual(UNRESOLVED, Lint([self.jar], jobs=2,
+                                      parseCache=parseCache))
+
+  def testParseCacheRebuildsDamagedEntries(self):
+    parseCache = ParseCache(self.Path('cache'), guice_lint.PARSER_VERSION)
+    self.assertEqual(UNRESOLVED, Lint([self.jar], parseCache=parseCache))
+    paths = [os.path.join(root, name)
+             for root, _, names in os.walk(parseCache.directory)
+             for name in names]
+    self.assertTrue(paths)
+    for i, path in enumerate(paths):
+      with open(path, 'rb') as f:
+        data = f.read()
+      if i % 2:
+        # Truncated.
+        data = data[:len(data) // 2]
+      else:
+        # Corrupt payload, caught by the checksum.
+        data = data[:-1] + chr(ord(data[-1]) ^ 0xff)
+      with open(path, 'wb') as f:
+        f.write(data)
+    hits = parseCache.hits
+    self.assertEqual(UNRESOLVED, Lint([self.jar], parseCache=parseCache))
+    self.assertEqual(len(paths), parseCache.rebuilt)
+    self.assertEqual(hits, parseCache.hits)
+    self.assertEqual(UNRESOLVED, Lint([self.jar], parseCache=parseCache))
+    self.assertEqual(hits + len(paths), parseCache.hits)
+
+  def testWarmClasses(self):
+    warmClasses = ClassCache()
+    self.assertEqual(UNRESOLVED, Lint([self.jar], warmClasses=warmClasses))
+    self.assertEqual(UNRESOLVED, Lint([self.jar], warmClasses=warmClasses))
+    self.assertEqual(warmClasses.misses, warmClasses.hits)
+
+  def testClassDirectory(self):
+    classes = self.Path('classes')
+    for name, data in self.classes.iteritems():
+      path = os.path.join(classes, *name.split('/'))
+      if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+      with open(path, 'wb') as f:
+        f.write(data)
+    parseCache = ParseCache(self.Path('cache'), guice_lint.PARSER_VERSION)
+    runs = []
+    for _ in xrange(2):
+      session = guice_lint.LintSession([classes], parseCache=parseCache)
+      try:
+        self.assertEqual(UNRESOLVED, session.Lint('app.Main'))
+      finally:
+        session.Close()
+      index, = session.directoryIndexes.values()
+      runs.append((index.hits, index.misses, session.classesParsed))
+    # Parsed on the first run, all from the index on the second.
+    first, second = runs
+    self.assertEqual(0, first[0])
+    self.assertTrue(first[2])
+    self.assertEqual((first[1], 0, 0), second)
+
+  def testFatJar(self):
+    for compression in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+      inner = io.BytesIO()
+      WriteJar(inner, dict((name, data) for name, data
+                           in self.classes.iteritems()
+                           if name != 'app/Main.class'))
+      jar = self.Path('fat.jar')
+      z = zipfile.ZipFile(jar, 'w', zipfile.ZIP_DEFLATED)
+      try:
+        z.writestr('META-INF/MANIFEST.MF', 'Manifest-Version: 1.0\n'
+                   'Main-Class: org.springframework.boot.loader.JarLauncher\n'
+                   'Start-Class: app.Main\n')
+        z.writestr('BOOT-INF/classes/app/Main.class',
+                   self.classes['app/Main.class'])
+        info = zipfile.ZipInfo('BOOT-INF/lib/app.jar')
+        info.compress_type = compression
+        z.writestr(info, inner.getvalue())
+      finally:
+        z.close()
+      session = guice_lint.LintSession([jar])
+      try:
+        manifest = session.classPath.Open('META-INF/MANIFEST.MF').read()
+        self.assertEqual('app.Main', guice_lint.GetMain(manifest))
+        self.assertEqual(UNRESOLVED, session.Lint('app.Main'))
+      finally:
+        session.Close()
+
+
+class LintDaemonTest(unittest.TestCase):
+  """Lints served warm, and what the daemon keeps between them."""
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.entries = AppClasses()
+    self.entries['META-INF/MANIFEST.MF'] = (
+        'Manifest-Version: 1.0\nMain-Class: app.Main\n')
+    self.jar = os.path.join(self.directory, 'app.jar')
+    self.WriteJar(0)
+    self.daemon = lintdaemon.LintDaemon()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def WriteJar(self, version):
+    """Writes the app jar with version more fields in FooImpl."""
+    w = ClassWriter('app/FooImpl')
+    jargen.Constructor(w, 'java/lang/Object', '(Lapp/Bar;Ljava/lang/String;)V',
+                       annotations=[(INJECT, None)],
+                       parameterAnnotations=[[], [(NAMED, 'x')]])
+    w.AddField('baz', 'Lapp/Baz;', annotations=[(INJECT, None)])
+    for i in xrange(version):
+      w.AddField('field%d' % i, 'I')
+    self.entries['app/FooImpl.class'] = w.ToBytes()
+    WriteJar(self.jar, self.entries)
+    # The mtime alone may not tell the versions apart.
+    os.utime(self.jar, (version, version))
+
+  def Lint(self):
+    response = self.daemon.Lint({'jar': self.jar})
+    self.assertEqual(UNRESOLVED, set(tuple(key) for key
+                                     in response['unresolved']))
+    return response
+
+  def testRoundTrip(self):
+    socketPath = os.path.join(self.directory, 'socket')
+    server = SocketServer.UnixStreamServer(socketPath, lintdaemon.LintHandler)
+    server.lintDaemon = self.daemon
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+      for cached in (False, True):
+        response = lintclient.Request(socketPath, {'jar': self.jar})
+        self.assertEqual(UNRESOLVED, set(tuple(key) for key
+                                         in response['unresolved']))
+        self.assertEqual(cached, response['cached'])
+      response = lintclient.Request(socketPath, {'jar': self.jar,
+                                                 'mainClass': 'app.Nope'})
+      self.assertEqual({'error': 'main class app.Nope not on the class path'},
+                       response)
+    finally:
+      server.shutdown()
+      server.server_close()
+      thread.join()
+
+  def testClassDirectory(self):
+    classes = os.path.join(self.directory, 'classes')
+    zipfile.ZipFile(self.jar).extractall(classes)
+    self.daemon.parseCache = ParseCache(os.path.join(self.directory, 'cache'),
+                                        guice_lint.PARSER_VERSION)
+    self.jar = classes
+    self.assertEqual(3, self.Lint()['parsed'])
+    self.assertEqual(0, self.Lint()['parsed'])
+
+  def testChangedClassReplacesWarmOne(self):
+    first = self.Lint()
+    self.assertFalse(first['cached'])
+    self.assertTrue(self.Lint()['cached'])
+    warm = len(self.daemon.warmClasses)
+    for version in (1, 2):
+      self.WriteJar(version)
+      response = self.Lint()
+      self.assertFalse(response['cached'])
+      self.assertEqual(1, response['parsed'])
+      self.assertEqual(warm, len(self.daemon.warmClasses))
+    self.assertEqual(1, len(self.daemon.results))
+    self.assertEqual(first['classes'], self.Lint()['classes'])
+
+
+class GeneratedJarTest(unittest.TestCase):
+  """A jargen jar, whose injections are all satisfiable."""
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.jar = os.path.join(self.directory, 'generated.jar')
+    jargen.GenerateJar(self.jar, jargen.SpecForClassCount(300))
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def Lint(self, jobs):
+    parseCache = ParseCache(os.path.join(self.directory, 'cache%d' % jobs),
+                            guice_lint.PARSER_VERSION)
+    session = guice_lint.LintSession([self.jar], parseCache=parseCache,
+                                     jobs=jobs)
+    try:
+      unresolved = session.Lint('gen.Main')
+      return (unresolved, len(session.shallowClasses),
+              len(session.loadedClasses), parseCache.misses)
+    finally:
+      session.Close()
+
+  def testJobsPrefilterLikeSerial(self):
+    serial = self.Lint(1)
+    self.assertEqual(set(), serial[0])
+    self.assertTrue(serial[1] > 0)
+    self.assertEqual(serial, self.Lint(2))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,249 @@
+# Copyright 2026 The guicelint Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tracks class constants through a method's operand stack and locals.
+
+Interpret sweeps a decoded InstructionStream once, from first instruction to
+last, keeping a symbolic operand stack and the reference locals. Most values
+are None, meaning unknown; the ones Guice bindings are built from are
+tuples:
+
+  ('class', name)          a Foo.class literal
+  ('str', s)               a string literal
+  ('named', s)             Names.named(s)
+  ('key', name, named)     Key.get(Foo.class[, Names.named(s)])
+  ('binding', name, named) bind(...), maybe .annotatedWith(Names.named(s))
+  ('new', name)            a new Foo
+
+so bind(key).annotatedWith(named).to(Foo.class) is understood even when the
+pieces go through locals or other calls. Branches are not followed: the
+stack is simply emptied after an instruction that does not fall through,
+and a value stored on only one path is still seen after the paths join.
+That is imprecise only for methods far stranger than a configure().
+"""
+
+from opcodes import blockEndOpcodes
+from opcodes import stackEffects
+
+NAMES_NAMED = 'com/google/inject/name/Names.named'
+KEY_GET = 'com/google/inject/Key.get'
+
+# Stack slots taken by a field or return value of each type.
+TYPE_SLOTS = {'J': 2, 'D': 2, 'V': 0}
+
+# dup, dup_x1, dup_x2, dup2, dup2_x1, dup2_x2 and swap as slots popped and
+# which of them (0 being the top) are pushed back, bottom first.
+SHUFFLES = {
+    0x59: (1, (0, 0)),
+    0x5a: (2, (0, 1, 0)),
+    0x5b: (3, (0, 2, 1, 0)),
+    0x5c: (2, (1, 0, 1, 0)),
+    0x5d: (3, (1, 0, 2, 1, 0)),
+    0x5e: (4, (1, 0, 3, 2, 1, 0)),
+    0x5f: (2, (0, 1)),
+}
+
+UNKNOWN = [(None,) * n for n in xrange(5)]
+
+# descriptor -> (argument slots, return slots)
+_descriptorSlots = {}
+
+
+def DescriptorSlots(descriptor):
+  """Returns the stack slots a method descriptor's arguments and result take.
+  """
+  slots = _descriptorSlots.get(descriptor)
+  if slots is None:
+    args = 0
+    i = 1
+    while descriptor[i] != ')':
+      c = descriptor[i]
+      array = c == '['
+      while c == '[':
+        i += 1
+        c = descriptor[i]
+      if c == 'L':
+        i = descriptor.index(';', i)
+      if c in 'JD' and not array:
+        args += 2
+      else:
+        args += 1
+      i += 1
+    slots = (args, TYPE_SLOTS.get(descriptor[i + 1], 1))
+    _descriptorSlots[descriptor] = slots
+  return slots
+
+
+def CallShape(callNames, callDescriptors, index, static):
+  """Returns (call, argument slots, result slots, whether it is modelled)
+  for a call to methodref index, or all None if that is unknown.
+
+  The arguments include the receiver unless the call is static, and a
+  modelled call returns one value worked out by CallResult.
+  """
+  descriptor = callDescriptors.get(index)
+  if descriptor is None:
+    return None, None, None, None
+  call = callNames[index]
+  argSlots, returnSlots = DescriptorSlots(descriptor)
+  if not static:
+    argSlots += 1
+  modelled = returnSlots == 1 and (
+      call == NAMES_NAMED or call == KEY_GET or call.endswith('.bind') or
+      call.endswith('.annotatedWith'))
+  return call, argSlots, returnSlots, modelled
+
+
+def CallResult(call, args):
+  """Returns the symbolic result of call, or None if it is not modelled.
+
+  args are the call's arguments, receiver first, as stack slots.
+  """
+  if call == NAMES_NAMED:
+    value = args[-1]
+    if value is not None and value[0] == 'str':
+      return ('named', value[1])
+  elif call == KEY_GET:
+    value = args[0]
+    if value is not None and value[0] == 'class':
+      named = None
+      if len(args) > 1 and args[1] is not None and args[1][0] == 'named':
+        named = args[1][1]
+      return ('key', value[1], named)
+  elif call.endswith('.bind'):
+    if len(args) == 2 and args[1] is not None:
+      value = args[1]
+      if value[0] == 'class':
+        return ('binding', value[1], None)
+      if value[0] == 'key':
+        return ('binding', value[1], value[2])
+  elif call.endswith('.annotatedWith'):
+    binding = args[0]
+    if binding is not None and binding[0] == 'binding':
+      value = args[-1]
+      if value is not None and value[0] == 'named':
+        return ('binding', binding[1], value[1])
+      return binding
+  return None
+
+
+def Interpret(classFile, code, visit):
+  """Interprets code, a method's full InstructionStream.
+
+  Calls visit(i, call, args) for each invoke at entry i of a method whose
+  'owner.name' is known, args being its receiver (unless static) and
+  arguments as symbolic stack slots.
+  """
+  constants = classFile.constants
+  callNames = classFile.CallNames()
+  callDescriptors = classFile.callDescriptors
+  opcodes = code.opcodes
+  operands = code.operands
+  effects = stackEffects
+  # methodref index -> CallShape
+  shapes = {}
+  stack = []
+  push = stack.append
+  variables = {}
+  for i in xrange(len(opcodes)):
+    op = opcodes[i]
+    effect = effects[op]
+    if effect is not None:
+      pops, pushes = effect
+      if pops:
+        del stack[-pops:]
+      if pushes:
+        stack.extend(UNKNOWN[pushes])
+      if op in blockEndOpcodes:
+        del stack[:]
+    elif 0xb6 <= op <= 0xba:
+      index = operands[i]
+      shape = shapes.get(index)
+      if shape is None:
+        shape = shapes[index] = CallShape(callNames, callDescriptors, index,
+                                          op == 0xb8)
+      call, argSlots, returnSlots, modelled = shape
+      if call is None:
+        # An invokedynamic; what it takes is not worth working out.
+        del stack[:]
+        continue
+      if argSlots:
+        args = stack[-argSlots:]
+        del stack[-argSlots:]
+        if len(args) < argSlots:
+          args[:0] = [None] * (argSlots - len(args))
+      else:
+        args = []
+      visit(i, call, args)
+      if modelled:
+        push(CallResult(call, args))
+      elif returnSlots:
+        stack.extend(UNKNOWN[returnSlots])
+    elif 0x2a <= op <= 0x2d:
+      push(variables.get(op - 0x2a))
+    elif 0x4b <= op <= 0x4e:
+      variables[op - 0x4b] = stack.pop() if stack else None
+    elif op == 0x19:
+      push(variables.get(operands[i]))
+    elif op == 0x3a:
+      variables[operands[i]] = stack.pop() if stack else None
+    elif op == 0x12 or op == 0x13:
+      constant = constants[operands[i]]
+      value = None
+      if constant is not None:
+        if constant.type == 'classref':
+          value = ('class', constants[constant.value].value)
+        elif constant.type == 'stringref':
+          value = ('str', constants[constant.value].value)
+      push(value)
+    elif op == 0x14:
+      stack.extend(UNKNOWN[2])
+    elif op in SHUFFLES:
+      pops, order = SHUFFLES[op]
+      popped = stack[-1:-pops - 1:-1]
+      del stack[-pops:]
+      if len(popped) < pops:
+        popped += UNKNOWN[pops - len(popped)]
+      stack.extend([popped[j] for j in order])
+    elif 0xb2 <= op <= 0xb5:
+      fieldType = constants[constants[constants[operands[i]].value[1]]
+                            .value[1]].value[0]
+      slots = TYPE_SLOTS.get(fieldType, 1)
+      if op == 0xb2:
+        stack.extend(UNKNOWN[slots])
+      elif op == 0xb3:
+        del stack[-slots:]
+      elif op == 0xb4:
+        del stack[-1:]
+        stack.extend(UNKNOWN[slots])
+      else:
+        del stack[-slots - 1:]
+    elif op == 0xbb:
+      push(('new', constants[constants[operands[i]].value].value))
+    elif op == 0xc0:
+      pass
+    elif op == 0xc4:
+      inner = ord(code.data[code.offsets[i] + 1])
+      if inner == 0x3a:
+        variables[operands[i]] = stack.pop() if stack else None
+      elif inner == 0x19:
+        push(variables.get(operands[i]))
+      else:
+        pops, pushes = effects[inner]
+        if pops:
+          del stack[-pops:]
+        stack.extend(UNKNOWN[pushes])
+    elif op == 0xc5:
+      del stack[-ord(code.data[code.offsets[i] + 3]):]
+      push(None)
@@ -0,0 +1,304 @@
+# Copyright 2026 The guicelint Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Generates synthetic Guice application jars for benchmarking.
+
+Usage: python jargen.py [options] out.jar
+
+The jar's Main-Class builds an injector from a number of AbstractModule
+subclasses. Each module binds chains of interfaces with bind().to(), has
+@Provides methods and installs a chain of nested modules. The bound
+implementations have @Inject constructors and fields and sit at the bottom
+of a class hierarchy with more @Inject fields. Filler classes that only
+call each other pad the jar out to the requested size. Every injection is
+satisfiable, so guice_lint should exit cleanly on the result.
+"""
+
+import optparse
+import struct
+import sys
+import zipfile
+
+from classwriter import ACC_ABSTRACT
+from classwriter import ACC_INTERFACE
+from classwriter import ACC_PUBLIC
+from classwriter import ACC_STATIC
+from classwriter import ClassWriter
+from collections import namedtuple
+
+Spec = namedtuple('Spec', 'modules installDepth bindingsPerModule chainLength'
+                  ' providesPerModule injectables dependencies injectedFields'
+                  ' hierarchyDepth fillers fillerCalls roots')
+
+ABSTRACT_MODULE = 'com/google/inject/AbstractModule'
+BINDING_BUILDER = 'com/google/inject/binder/AnnotatedBindingBuilder'
+INJECTOR = 'com/google/inject/Injector'
+MODULE = 'com/google/inject/Module'
+INJECT = 'com/google/inject/Inject'
+PROVIDES = 'com/google/inject/Provides'
+NAMED = 'com/google/inject/name/Named'
+NAME = 'generated'
+
+
+def SpecForClassCount(numClasses):
+  """Returns a Spec whose jar has roughly numClasses classes."""
+  allModules = max(3, numClasses // 40)
+  installDepth = 2
+  modules = allModules // (installDepth + 1)
+  injectables = max(1, numClasses // 4)
+  spec = Spec(modules=modules, installDepth=installDepth, bindingsPerModule=4,
+              chainLength=2, providesPerModule=2, injectables=injectables,
+              dependencies=2, injectedFields=1, hierarchyDepth=3, fillers=0,
+              fillerCalls=3, roots=min(100, injectables))
+  return spec._replace(fillers=max(0, numClasses - ClassCount(spec)))
+
+
+def ClassCount(spec):
+  allModules = spec.modules * (spec.installDepth + 1)
+  return (1 + allModules +
+          allModules * spec.bindingsPerModule * spec.chainLength +
+          allModules * spec.providesPerModule + spec.injectables +
+          BaseChains(spec) * spec.hierarchyDepth + spec.fillers)
+
+
+def BaseChains(spec):
+  if not spec.hierarchyDepth:
+    return 0
+  return max(1, spec.injectables // 20)
+
+
+def Service(binding, link):
+  return 'gen/Service%d_%d' % (binding, link)
+
+
+def Provided(i):
+  return 'gen/Provided%d' % i
+
+
+def Impl(i):
+  return 'gen/Impl%d' % i
+
+
+def Base(chain, level):
+  return 'gen/Base%d_%d' % (chain, level)
+
+
+def Util(i):
+  return 'gen/util/Util%d' % i
+
+
+def Interface(name):
+  return ClassWriter(name, accessFlags=ACC_PUBLIC | ACC_INTERFACE |
+                     ACC_ABSTRACT).ToBytes()
+
+
+def Constructor(writer, superName, desc='()V', **kwargs):
+  code = '\x2a' + struct.pack('>BH', 0xb7,
+                              writer.Methodref(superName, '<init>', '()V'))
+  writer.AddMethod('<init>', desc, code + '\xb1', **kwargs)
+
+
+def New(writer, name):
+  """new name; dup; invokespecial name.<init>()V"""
+  return (struct.pack('>BH', 0xbb, writer.Class(name)) + '\x59' +
+          struct.pack('>BH', 0xb7, writer.Methodref(name, '<init>', '()V')))
+
+
+class Generator(object):
+  def __init__(self, spec):
+    self.spec = spec
+    self.bindings = 0
+    self.provides = 0
+    self.classes = {}
+
+  def Add(self, name, data):
+    self.classes[name + '.class'] = data
+
+  def Generate(self):
+    spec = self.spec
+    topModules = []
+    for i in xrange(spec.modules):
+      names = ['gen/Module%d' % i] + ['gen/Module%d_%d' % (i, depth)
+                                      for depth in xrange(1, spec.installDepth
+                                                          + 1)]
+      for depth, name in enumerate(names):
+        installs = names[depth + 1] if depth + 1 < len(names) else None
+        self.AddModule(name, installs, named=(i == 0 and depth == 0))
+      topModules.append(names[0])
+    for binding in xrange(self.bindings):
+      for link in xrange(spec.chainLength):
+        self.Add(Service(binding, link), Interface(Service(binding, link)))
+    for i in xrange(self.provides):
+      self.Add(Provided(i), Interface(Provided(i)))
+    for i in xrange(spec.injectables):
+      self.AddImpl(i)
+    for chain in xrange(BaseChains(spec)):
+      for level in xrange(spec.hierarchyDepth):
+        self.AddBase(chain, level)
+    for i in xrange(spec.fillers):
+      self.AddUtil(i)
+    self.AddMain(topModules)
+
+  def AddModule(self, name, installs, named):
+    spec = self.spec
+    w = ClassWriter(name, ABSTRACT_MODULE)
+    Constructor(w, ABSTRACT_MODULE)
+    bind = w.Methodref(name, 'bind', '(Ljava/lang/Class;)L%s;' %
+                       BINDING_BUILDER)
+    to = w.InterfaceMethodref(BINDING_BUILDER, 'to',
+                              '(Ljava/lang/Class;)Lcom/google/inject/binder/'
+                              'ScopedBindingBuilder;')
+    code = ''
+    for _ in xrange(spec.bindingsPerModule):
+      binding = self.bindings
+      self.bindings += 1
+      chain = [Service(binding, link) for link in xrange(spec.chainLength)]
+      chain.append(Impl(binding % spec.injectables))
+      for source, target in zip(chain, chain[1:]):
+        code += ('\x2a' + w.LoadClassConstant(source) +
+                 struct.pack('>BH', 0xb6, bind) +
+                 w.LoadClassConstant(target) +
+                 struct.pack('>BHBB', 0xb9, to, 2, 0) + '\x57')
+    if installs is not None:
+      code += ('\x2a' + New(w, installs) +
+               struct.pack('>BH', 0xb6, w.Methodref(name, 'install',
+                                                    '(L%s;)V' % MODULE)))
+    w.AddMethod('configure', '()V', code + '\xb1')
+    for _ in xrange(spec.providesPerModule):
+      provided = self.provides
+      self.provides += 1
+      w.AddMethod('provide%d' % provided, '()L%s;' % Provided(provided),
+                  '\x01\xb0', annotations=[(PROVIDES, None)])
+    if named:
+      w.AddMethod('provideName', '()Ljava/lang/String;', '\x01\xb0',
+                  annotations=[(PROVIDES, None), (NAMED, NAME)])
+    self.Add(name, w.ToBytes())
+
+  def AddImpl(self, i):
+    spec = self.spec
+    superName = 'java/lang/Object'
+    if spec.hierarchyDepth:
+      superName = Base(i % BaseChains(spec), spec.hierarchyDepth - 1)
+    w = ClassWriter(Impl(i), superName)
+    args = []
+    for j in xrange(1, spec.dependencies + 1):
+      if i + j < spec.injectables:
+        args.append(('L%s;' % Impl(i + j), []))
+    if self.provides:
+      args.append(('L%s;' % Provided(i % self.provides), []))
+    if i % 10 == 0:
+      args.append(('Ljava/lang/String;', [(NAMED, NAME)]))
+    Constructor(w, superName, '(%s)V' % ''.join(desc for desc, _ in args),
+                annotations=[(INJECT, None)],
+                parameterAnnotations=[named for _, named in args])
+    for j in xrange(spec.injectedFields):
+      if i + spec.dependencies + j + 1 < spec.injectables:
+        fieldType = Impl(i + spec.dependencies + j + 1)
+      elif self.provides:
+        fieldType = Provided((i + j) % self.provides)
+      else:
+        continue
+      w.AddField('field%d' % j, 'L%s;' % fieldType,
+                 annotations=[(INJECT, None)])
+    self.Add(Impl(i), w.ToBytes())
+
+  def AddBase(self, chain, level):
+    superName = 'java/lang/Object'
+    if level:
+      superName = Base(chain, level - 1)
+    w = ClassWriter(Base(chain, level), superName, ACC_PUBLIC | ACC_ABSTRACT)
+    Constructor(w, superName)
+    if self.provides:
+      w.AddField('base%d' % level,
+                 'L%s;' % Provided((chain + level) % self.provides),
+                 annotations=[(INJECT, None)])
+    self.Add(Base(chain, level), w.ToBytes())
+
+  def AddUtil(self, i):
+    spec = self.spec
+    w = ClassWriter(Util(i))
+    Constructor(w, 'java/lang/Object')
+    code = ''
+    for j in xrange(spec.fillerCalls):
+      callee = Util((i * 31 + j * 17 + 1) % spec.fillers)
+      code += struct.pack('>BH', 0xb8, w.Methodref(callee, 'helper', '()V'))
+    # A little arithmetic so the method is not all calls.
+    code += '\x03\x3c\x84\x01\x01\x1b\x57'
+    w.AddMethod('helper', '()V', code + '\xb1',
+                accessFlags=ACC_PUBLIC | ACC_STATIC)
+    self.Add(Util(i), w.ToBytes())
+
+  def AddMain(self, topModules):
+    spec = self.spec
+    w = ClassWriter('gen/Main')
+    Constructor(w, 'java/lang/Object')
+    code = (struct.pack('>BhBH', 0x11, len(topModules), 0xbd,
+                        w.Class(MODULE)))
+    for i, module in enumerate(topModules):
+      code += '\x59' + struct.pack('>Bh', 0x11, i) + New(w, module) + '\x53'
+    code += struct.pack('>BH', 0xb8, w.Methodref(
+        'com/google/inject/Guice', 'createInjector',
+        '([L%s;)L%s;' % (MODULE, INJECTOR)))
+    code += '\x4c'
+    getInstance = w.InterfaceMethodref(INJECTOR, 'getInstance',
+                                       '(Ljava/lang/Class;)Ljava/lang/Object;')
+    roots = [Service(b, 0) for b in xrange(min(spec.roots, self.bindings))]
+    roots.append(Impl(0))
+    for root in roots:
+      code += ('\x2b' + w.LoadClassConstant(root) +
+               struct.pack('>BHBB', 0xb9, getInstance, 2, 0) + '\x57')
+    for i in xrange(min(10, spec.fillers)):
+      code += struct.pack('>BH', 0xb8, w.Methodref(Util(i), 'helper', '()V'))
+    w.AddMethod('main', '([Ljava/lang/String;)V', code + '\xb1',
+                accessFlags=ACC_PUBLIC | ACC_STATIC)
+    self.Add('gen/Main', w.ToBytes())
+
+  def Write(self, path, compression=zipfile.ZIP_DEFLATED):
+    z = zipfile.ZipFile(path, 'w', compression, allowZip64=True)
+    try:
+      z.writestr('META-INF/MANIFEST.MF',
+                 'Manifest-Version: 1.0\nMain-Class: gen.Main\n')
+      for name in sorted(self.classes):
+        z.writestr(name, self.classes[name])
+    finally:
+      z.close()
+
+
+def GenerateJar(path, spec):
+  """Writes a jar for spec to path and returns the number of classes."""
+  generator = Generator(spec)
+  generator.Generate()
+  generator.Write(path)
+  return len(generator.classes)
+
+
+def main(argv):
+  parser = optparse.OptionParser(usage='%prog [options] out.jar')
+  parser.add_option('--classes', type='int', default=1000,
+                    help='Approximate number of classes to generate.')
+  for field in Spec._fields:
+    parser.add_option('--' + field, type='int',
+                      help='Override the %s setting.' % field)
+  options, args = parser.parse_args(argv[1:])
+  if len(args) != 1:
+    parser.error('expected an output jar')
+  spec = SpecForClassCount(options.classes)
+  overrides = dict((field, getattr(options, field)) for field in Spec._fields
+                   if getattr(options, field) is not None)
+  spec = spec._replace(**overrides)
+  print '%d classes written to %s' % (GenerateJar(args[0], spec), args[0])
+
+
+if __name__ == '__main__':
+  main(sys.argv)
@@ -0,0 +1,151 @@
+# Copyright 2026 The guicelint Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Lints many jars in one process, parsing each shared class only once.
+
+Usage: python lintbatch.py [options] app1.jar app2.jar ...
+
+Parsed classes are shared between the jars through a ClassCache keyed on
+each entry's name, CRC-32 and size as recorded in the jar's central
+directory. A class file names itself, so that is in effect a content hash:
+the same library class bundled in every jar is parsed for the first and
+reused by the rest. Exits with 1 if any jar has unresolved injections and
+2 if any jar could not be linted at all.
+"""
+
+import json
+import optparse
+import os
+import sys
+import time
+
+import guice_lint
+from classcache import ClassCache
+from collections import namedtuple
+from parsecache import ParseCache
+
+JarResult = namedtuple('JarResult', 'jar unresolved classes parsed shared'
+                       ' seconds error')
+
+
+def LintJars(jars, classpath=(), callDepth=3, parseCache=None,
+             warmClasses=None):
+  """Lints each jar, with classpath after it, and returns their JarResults.
+
+  Every jar's session shares warmClasses, a new unbounded ClassCache by
+  default.
+  """
+  if warmClasses is None:
+    warmClasses = ClassCache()
+  results = []
+  for jar in jars:
+    start = time.time()
+    hits, misses = warmClasses.hits, warmClasses.misses
+    unresolved = None
+    error = None
+    session = None
+    try:
+      session = guice_lint.LintSession([jar] + list(classpath),
+                                       parseCache=parseCache,
+                                       callDepth=callDepth,
+                                       warmClasses=warmClasses)
+      manifest = session.classPath.Open('META-INF/MANIFEST.MF').read()
+      unresolved = sorted(session.Lint(guice_lint.GetMain(manifest)))
+    except Exception, e:
+      # One broken jar should not stop the rest of the batch.
+      error = '%s: %s' % (type(e).__name__, e)
+    finally:
+      classes = 0
+      if session is not None:
+        classes = len(session.loadedClasses)
+        session.Close()
+    results.append(JarResult(jar, unresolved, classes,
+                             warmClasses.misses - misses,
+                             warmClasses.hits - hits, time.time() - start,
+                             error))
+  return results
+
+
+def Report(results, warmClasses):
+  """Returns the per-jar results and dedup statistics as text."""
+  lines = []
+  for r in results:
+    if r.error is not None:
+      lines.append('%s: error: %s' % (r.jar, r.error))
+      continue
+    lines.append('%s: %s (%d classes, %d parsed, %d shared, %.2f s)' % (
+        r.jar, r.unresolved and '%d unresolved' % len(r.unresolved) or 'ok',
+        r.classes, r.parsed, r.shared, r.seconds))
+    for className, named in r.unresolved:
+      if named is not None:
+        lines.append('  Named(%s) %s' % (named, className))
+      else:
+        lines.append('  ' + className)
+  loads = sum(r.parsed + r.shared for r in results)
+  parsed = sum(r.parsed for r in results)
+  lines.append('')
+  lines.append('%d jars, %d class loads, %d parsed, %d shared (%.1fx dedup), '
+               '%d classes kept, %.2f s' % (
+                   len(results), loads, parsed, loads - parsed,
+                   float(loads) / max(1, parsed), len(warmClasses),
+                   sum(r.seconds for r in results)))
+  return '\n'.join(lines)
+
+
+def main(argv):
+  parser = optparse.OptionParser(usage='%prog [options] app.jar ...')
+  parser.add_option('--classpath', default='',
+                    help='Jars and class directories, separated by "%s", to '
+                    'search after each app jar.' % os.pathsep)
+  parser.add_option('--jars-from', metavar='FILE',
+                    help='Also lint the jars listed in FILE, one per line.')
+  parser.add_option('--cache-dir',
+                    help='Also cache parsed classes in this directory.')
+  parser.add_option('--call-depth', type='int', default=3,
+                    help='How many calls deep from main to look for modules; '
+                    '0 for no limit.')
+  parser.add_option('--max-class-memory', type='int', metavar='MB',
+                    help='Keep roughly this many MB of shared classes.')
+  parser.add_option('--json', action='store_true',
+                    help='Print the results as JSON.')
+  options, jars = parser.parse_args(argv[1:])
+  if options.jars_from:
+    with open(options.jars_from) as f:
+      jars += [line.strip() for line in f if line.strip()]
+  if not jars:
+    parser.error('expected at least one jar')
+  parseCache = None
+  if options.cache_dir:
+    parseCache = ParseCache(options.cache_dir, guice_lint.PARSER_VERSION)
+  maxClassBytes = None
+  if options.max_class_memory:
+    maxClassBytes = options.max_class_memory << 20
+  warmClasses = ClassCache(maxClassBytes)
+  results = LintJars(jars, [p for p in options.classpath.split(os.pathsep)
+                            if p],
+                     options.call_depth or None, parseCache, warmClasses)
+  if options.json:
+    print json.dumps([r._asdict() for r in results], indent=2)
+  else:
+    print Report(results, warmClasses)
+  if parseCache is not None:
+    print >> sys.stderr, parseCache.Stats()
+  if any(r.error is not None for r in results):
+    exit(2)
+  if any(r.unresolved for r in results):
+    exit(1)
+
+
+if __name__ == '__main__':
+  main(sys.argv)
@@ -0,0 +1,88 @@
+# Copyright 2026 The guicelint Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Asks a running lintdaemon.py to lint a jar or class directory.
+
+Usage: python lintclient.py [options] socket app.jar|classes-dir
+
+Prints the same report and exits with the same status as guice_lint. Only
+the standard library is imported, so almost all the time is the daemon's.
+"""
+
+import json
+import optparse
+import os
+import socket
+import sys
+
+
+def Request(socketPath, request):
+  """Sends one request to the daemon and returns its response."""
+  s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  try:
+    s.connect(socketPath)
+    f = s.makefile('r+b')
+    f.write(json.dumps(request) + '\n')
+    f.flush()
+    line = f.readline()
+  finally:
+    s.close()
+  if not line:
+    raise IOError('lint daemon closed the connection')
+  return json.loads(line)
+
+
+def main(argv):
+  parser = optparse.OptionParser(
+      usage='%prog [options] socket app.jar|classes-dir')
+  parser.add_option('--classpath', default='',
+                    help='Jars and class directories, separated by "%s", to '
+                    'search after the app.' % os.pathsep)
+  parser.add_option('--main-class',
+                    help='Lint from the main methods of this class rather than '
+                    'the Main-Class of the manifest.')
+  parser.add_option('--call-depth', type='int', default=3,
+                    help='How many calls deep from main to look for modules; '
+                    '0 for no limit.')
+  parser.add_option('--verbose', action='store_true',
+                    help='Print timing and class counts to stderr.')
+  options, args = parser.parse_args(argv[1:])
+  if len(args) != 2:
+    parser.error('expected a socket path and a jar or class directory')
+  response = Request(args[0], {
+      'jar': os.path.abspath(args[1]),
+      'classpath': [os.path.abspath(p) for p in
+                    options.classpath.split(os.pathsep) if p],
+      'mainClass': options.main_class,
+      'callDepth': options.call_depth or None,
+  })
+  if 'error' in response:
+    print >> sys.stderr, 'lint daemon: ' + response['error']
+    exit(2)
+  if options.verbose:
+    print >> sys.stderr, '%.3f s, %d classes, %d parsed%s' % (
+        response['seconds'], response['classes'], response['parsed'],
+        response['cached'] and ', cached' or '')
+  if response['unresolved']:
+    print "Error! Could not resolve the following injections:"
+    for className, named in response['unresolved']:
+      if named is not None:
+        print '  Named(%s) %s' % (named, className)
+      else:
+        print '  ' + className
+    exit(1)
+
+
+if __name__ == '__main__':
+  main(sys.argv)
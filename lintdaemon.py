@@ -0,0 +1,205 @@
+# Copyright 2026 The guicelint Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Keeps guice_lint warm between runs, serving lints over a Unix socket.
+
+Usage: python lintdaemon.py [options] socket
+
+Each request is a line of JSON,
+  {"jar": ..., "classpath": [...], "mainClass": ..., "callDepth": ...}
+of which only jar, a jar or class directory, is required, and mainClass
+too if it has no manifest. Each is answered with a line of JSON,
+  {"unresolved": [[class, name], ...], "classes": ..., "parsed": ...,
+   "cached": ..., "seconds": ...}
+or {"error": ...}. See lintclient.py.
+
+Parsed classes stay in memory keyed on their entry's name, CRC and size, so
+a request only parses the classes that changed since they were last seen.
+Jars are indexed again when their mtime or size changes, which also drops
+the classes of entries that changed or went. A request whose jars all still
+have the same entries and CRCs as the last request for those jars gets its
+answer straight back.
+"""
+
+import json
+import optparse
+import os
+import signal
+import SocketServer
+import sys
+import time
+
+import guice_lint
+from classcache import ClassCache
+from classpath import ClassPath
+from classpath import NestedContainers
+from classpath import OpenContainer
+from parsecache import ParseCache
+
+
+# Default for --max-class-memory, in MB.
+MAX_CLASS_MEMORY = 256
+
+
+def WarmKeys(containers):
+  """Returns the warm class keys of every entry in containers."""
+  keys = set()
+  for container in containers:
+    for name in container.Names():
+      key = container.CacheKey(name)
+      if key is not None:
+        keys.add((name,) + key)
+  return keys
+
+
+class LintDaemon(object):
+  def __init__(self, parseCache=None, maxClassBytes=None):
+    self.parseCache = parseCache
+    self.warmClasses = ClassCache(maxClassBytes)
+    # path -> ((mtime, size), containers, fingerprint)
+    self.containers = {}
+    # paths -> (mainClass, callDepth, fingerprints, response), only the
+    # latest for each set of jars.
+    self.results = {}
+
+  def Containers(self, path):
+    """Returns path's containers and a fingerprint of their contents.
+
+    Those are path's own and, for a fat jar or a war, those of what it
+    bundles; see NestedContainers. A jar is only indexed again if its mtime
+    or size changed, and its fingerprint covers every entry's name and CRC,
+    inner jars included, so a jar that was merely rebuilt identically keeps
+    it. Directories are walked every time and have no fingerprint, since
+    their mtime says nothing about the files below. Jar containers stay
+    open between requests and are only closed once indexed again, when the
+    warm classes of the entries that changed are dropped with them.
+    """
+    if os.path.isdir(path):
+      return [OpenContainer(path)], None
+    st = os.stat(path)
+    stamp = (st.st_mtime, st.st_size)
+    cached = self.containers.get(path)
+    if cached is None or cached[0] != stamp:
+      # Warm classes outlive the jar's contents if it is rewritten in place,
+      # so they must not point into its mapping.
+      container = OpenContainer(path, zeroCopy=False)
+      fingerprint = hash(frozenset((name, container.CacheKey(name))
+                                   for name in container.Names()))
+      containers = [container] + NestedContainers(container)
+      if cached is not None:
+        for key in WarmKeys(cached[1]) - WarmKeys(containers):
+          self.warmClasses.Discard(key)
+        for oldContainer in cached[1]:
+          oldContainer.Close()
+      cached = (stamp, containers, fingerprint)
+      self.containers[path] = cached
+    return cached[1], cached[2]
+
+  def Lint(self, request):
+    start = time.time()
+    paths = tuple(os.path.abspath(p) for p in
+                  [request['jar']] + list(request.get('classpath', ())))
+    mainClass = request.get('mainClass')
+    callDepth = request.get('callDepth', 3)
+    classPath = ClassPath()
+    fingerprints = []
+    for path in paths:
+      containers, fingerprint = self.Containers(path)
+      for container in containers:
+        classPath.AddContainer(container)
+      fingerprints.append(fingerprint)
+    key = (mainClass, callDepth, fingerprints)
+    if None not in fingerprints and paths in self.results:
+      if self.results[paths][:3] == key:
+        return dict(self.results[paths][3], cached=True, parsed=0,
+                    seconds=time.time() - start)
+    if mainClass is None and 'META-INF/MANIFEST.MF' not in classPath:
+      return {'error': 'no META-INF/MANIFEST.MF to find the main class in; '
+                       'give a mainClass'}
+    session = guice_lint.LintSession(classPath, parseCache=self.parseCache,
+                                     callDepth=callDepth,
+                                     warmClasses=self.warmClasses,
+                                     ownsClassPath=False)
+    try:
+      if mainClass is None:
+        manifest = classPath.Open('META-INF/MANIFEST.MF').read()
+        mainClass = guice_lint.GetMain(manifest)
+      try:
+        unresolved = sorted(session.Lint(mainClass))
+      except guice_lint.MainClassError, e:
+        return {'error': str(e)}
+      response = {
+          'unresolved': unresolved,
+          'classes': len(session.loadedClasses),
+          'parsed': session.classesParsed,
+          'cached': False,
+          'seconds': time.time() - start,
+      }
+    finally:
+      session.Close()
+    self.results[paths] = key + (response,)
+    return response
+
+
+class LintHandler(SocketServer.StreamRequestHandler):
+  def handle(self):
+    while True:
+      line = self.rfile.readline()
+      if not line:
+        return
+      try:
+        response = self.server.lintDaemon.Lint(json.loads(line))
+      except Exception, e:
+        # Tell the client and keep serving everyone else.
+        response = {'error': '%s: %s' % (type(e).__name__, e)}
+      self.wfile.write(json.dumps(response) + '\n')
+      self.wfile.flush()
+
+
+def main(argv):
+  parser = optparse.OptionParser(usage='%prog [options] socket')
+  parser.add_option('--cache-dir',
+                    help='Also cache parsed classes in this directory.')
+  parser.add_option('--max-class-memory', type='int', metavar='MB',
+                    default=MAX_CLASS_MEMORY,
+                    help='Keep roughly this many MB of parsed classes warm; '
+                    '0 for no limit. Default %default.')
+  options, args = parser.parse_args(argv[1:])
+  if len(args) != 1:
+    parser.error('expected a socket path')
+  parseCache = None
+  if options.cache_dir:
+    parseCache = ParseCache(options.cache_dir, guice_lint.PARSER_VERSION)
+  maxClassBytes = None
+  if options.max_class_memory:
+    maxClassBytes = options.max_class_memory << 20
+  socketPath = args[0]
+  if os.path.exists(socketPath):
+    os.unlink(socketPath)
+  server = SocketServer.UnixStreamServer(socketPath, LintHandler)
+  server.lintDaemon = LintDaemon(parseCache, maxClassBytes)
+  print >> sys.stderr, 'guice_lint daemon listening on %s' % socketPath
+  # Clean up the socket on kill as well as on ^C.
+  signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+  try:
+    server.serve_forever()
+  except KeyboardInterrupt:
+    pass
+  finally:
+    server.server_close()
+    os.unlink(socketPath)
+
+
+if __name__ == '__main__':
+  main(sys.argv)
@@ -0,0 +1,239 @@
+# Copyright 2026 The guicelint Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Walks a method's call sites once on behalf of every analysis.
+
+Each Analysis subclass collects one kind of fact about a method. VisitMethod
+walks the method's InstructionStream a single time, resolves each call
+target once, and hands every call to all the registered analyses; the
+facts are then cached with the method's code, so no method is walked twice
+however many passes ask about it.
+
+Most methods are walked over their call sites alone, where an analysis can
+only see the instruction right before a call. Methods where Guice keys are
+built, configure() and those that call getInstance, are instead run through
+the interpreter, which hands each call its symbolic receiver and arguments.
+"""
+
+from interpreter import Interpret
+from opcodes import constantLoadOpcodes
+from opcodes import invokeOpcodes
+
+GET_INSTANCE = 'com/google/inject/Injector.getInstance'
+BIND_TO = 'com/google/inject/binder/AnnotatedBindingBuilder.to'
+BIND_TO_INSTANCE = 'com/google/inject/binder/AnnotatedBindingBuilder.toInstance'
+# Methods of a binding builder that complete a binding.
+BINDING_TARGETS = frozenset(['to', 'toInstance', 'toProvider'])
+
+
+class Analysis(object):
+  """Collects facts about one method; see VisitMethod."""
+  # Key of the result in the facts dict.
+  name = None
+
+  def __init__(self, classFile, code):
+    self.classFile = classFile
+    self.code = code
+
+  def Call(self, i, call, prevCall, args):
+    """Sees the call to 'owner.name' call at stream entry i.
+
+    prevCall is what the instruction right before it calls, if anything. args
+    are the receiver and arguments the interpreter worked out (see
+    interpreter.py), or None if the method was not interpreted.
+    """
+
+  def Result(self):
+    raise NotImplementedError
+
+  def LoadedConstant(self, i):
+    """Returns the constant loaded by entry i, or None if it is no ldc."""
+    code = self.code
+    if i < 0 or code.opcodes[i] not in constantLoadOpcodes:
+      return None
+    constants = self.classFile.constants
+    return constants[constants[code.operands[i]].value].value
+
+
+class CalledAnalysis(Analysis):
+  """Every 'owner.name' the method calls, in order."""
+  name = 'called'
+
+  def __init__(self, classFile, code):
+    Analysis.__init__(self, classFile, code)
+    self.called = []
+
+  def Call(self, i, call, prevCall, args):
+    self.called.append(call)
+
+  def Result(self):
+    return self.called
+
+
+class InjectedAnalysis(Analysis):
+  """Keys looked up with injector.getInstance(Foo.class or a Key)."""
+  name = 'injected'
+
+  def __init__(self, classFile, code):
+    Analysis.__init__(self, classFile, code)
+    self.injected = []
+
+  def Call(self, i, call, prevCall, args):
+    if call != GET_INSTANCE:
+      return
+    if args is not None:
+      key = args[-1]
+      if key is not None:
+        if key[0] == 'class':
+          self.injected.append((key[1], None))
+        elif key[0] == 'key':
+          self.injected.append((key[1], key[2]))
+    else:
+      key = self.LoadedConstant(i - 1)
+      if key is not None:
+        self.injected.append((key, None))
+
+  def Result(self):
+    return self.injected
+
+
+class BindingsAnalysis(Analysis):
+  """Keys bound and modules installed, if the method is a configure().
+
+  The result is (providers, injected, modules): keys bound with to(),
+  toInstance() or toProvider(), keys bound to, and the modules installed.
+  Without the interpreter, keys are only class literals loaded right before
+  the call and a module is the owner of whatever call produced it.
+  """
+  name = 'bindings'
+
+  def __init__(self, classFile, code):
+    Analysis.__init__(self, classFile, code)
+    self.bind = None
+    self.providers = []
+    self.injected = []
+    self.modules = []
+
+  def Call(self, i, call, prevCall, args):
+    if args is not None:
+      self.Interpreted(call, prevCall, args)
+    elif call.endswith('.install'):
+      if prevCall is not None:
+        if '.' in prevCall:
+          prevCall = prevCall[:prevCall.index('.')]
+        self.modules.append(prevCall)
+    elif call.endswith('.bind'):
+      bind = self.LoadedConstant(i - 1)
+      if bind is not None:
+        self.bind = bind
+    elif call == BIND_TO:
+      self.providers.append((self.bind, None))
+      to = self.LoadedConstant(i - 1)
+      if to is not None:
+        self.injected.append((to, None))
+    elif call == BIND_TO_INSTANCE:
+      self.providers.append((self.bind, None))
+
+  def Interpreted(self, call, prevCall, args):
+    binding = args[0] if args else None
+    if binding is not None and binding[0] == 'binding':
+      method = call[call.rindex('.') + 1:]
+      if method not in BINDING_TARGETS:
+        return
+      self.providers.append((binding[1], binding[2]))
+      if method == 'to':
+        to = args[-1]
+        if to is not None:
+          if to[0] == 'class':
+            self.injected.append((to[1], None))
+          elif to[0] == 'key':
+            self.injected.append((to[1], to[2]))
+    elif call.endswith('.install'):
+      module = args[-1]
+      if module is not None and module[0] == 'new':
+        self.modules.append(module[1])
+      elif prevCall is not None:
+        self.modules.append(prevCall[:prevCall.index('.')])
+
+  def Result(self):
+    return self.providers, self.injected, self.modules
+
+
+ANALYSES = [CalledAnalysis, InjectedAnalysis, BindingsAnalysis]
+
+# Facts of a method without code.
+NO_FACTS = dict((analysis.name, analysis(None, None).Result())
+                for analysis in ANALYSES)
+
+
+def Interpreted(classFile, methodName, code):
+  """Returns whether a method should be visited with the interpreter.
+
+  That is a configure(), or a method that itself calls getInstance; code is
+  its LazyCode. The method's facts are kept, so this is asked once each.
+  """
+  if methodName == 'configure':
+    return True
+  refs = classFile.getInstanceRefs
+  if refs is None:
+    refs = classFile.getInstanceRefs = frozenset(
+        index for index, call in classFile.CallNames().iteritems()
+        if call == GET_INSTANCE)
+  if not refs:
+    return False
+  sites = code.CallSites()
+  opcodes = sites.opcodes
+  operands = sites.operands
+  for i in xrange(len(opcodes)):
+    if opcodes[i] in invokeOpcodes and operands[i] in refs:
+      return True
+  return False
+
+
+def VisitMethod(classFile, code, profile=None, interpret=False):
+  """Walks code once and returns every analysis' result keyed on its name.
+
+  code is a method's call sites or, to interpret it, its full
+  InstructionStream.
+  """
+  analyses = [analysis(classFile, code) for analysis in ANALYSES]
+  calls = [analysis.Call for analysis in analyses]
+  if interpret:
+    # The call, if any, at the entry before the current one.
+    last = [-1, None]
+    def Visit(i, call, args):
+      prevCall = last[1] if last[0] == i - 1 else None
+      for c in calls:
+        c(i, call, prevCall, args)
+      last[0] = i
+      last[1] = call
+    Interpret(classFile, code, Visit)
+    if profile is not None:
+      profile.Count('instructions interpreted', len(code))
+    return dict((analysis.name, analysis.Result()) for analysis in analyses)
+  callNames = classFile.CallNames()
+  opcodes = code.opcodes
+  operands = code.operands
+  prevCall = None
+  for i in xrange(len(opcodes)):
+    call = None
+    if opcodes[i] in invokeOpcodes:
+      call = callNames.get(operands[i])
+      if call is not None:
+        for c in calls:
+          c(i, call, prevCall, None)
+    prevCall = call
+  if profile is not None:
+    profile.Count('instructions visited', len(opcodes))
+  return dict((analysis.name, analysis.Result()) for analysis in analyses)
@@ -20,13 +20,31 @@ A detailed description of opcodes.
 __author__ = 'cswenson@google.com (Christopher Swenson)'
 
 import struct
+from array import array
+
+# Precompiled big-endian operand readers.
+U1 = struct.Struct('>B')
+S1 = struct.Struct('>b')
+S1S1 = struct.Struct('>bb')
+S2 = struct.Struct('>h')
+S4 = struct.Struct('>i')
+S4S4 = struct.Struct('>ii')
+U2 = struct.Struct('>H')
+U2U1 = struct.Struct('>HB')
+U2U2 = struct.Struct('>HH')
+U4X2 = struct.Struct('>II')
+U4X3 = struct.Struct('>III')
 
 class OpcodeError(IOError): pass
 
 class Opcode(object):
-  """Base class for all Java ops"""
+  """Base class for all Java ops.
+
+  data is the whole code array of the method and addr is the offset of this
+  instruction within it, so decoding never slices the bytecode.
+  """
   def __init__(self, data, addr):
-    self.opcode = ord(data[0])
+    self.opcode = ord(data[addr])
     self.size = 1
   def __repr__(self):
     return str(self)
@@ -167,7 +185,7 @@ class InvokeStaticOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>H', data[1:3])[0]
+    self.index = U2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'invokestatic(%d)' % self.index
 
@@ -175,7 +193,7 @@ class InvokeInterfaceOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 5
-    self.index, self.count = struct.unpack('>HB', data[1:4])
+    self.index, self.count = U2U1.unpack_from(data, addr + 1)
   def __str__(self):
     return 'invokeinterface(%d, %d)' % (self.index, self.count)
 
@@ -183,7 +201,7 @@ class InvokeDynamicOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 5
-    self.index = struct.unpack('>H', data[1:3])[0]
+    self.index = U2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'invokedynamic(%d)' % (self.index)
 
@@ -191,7 +209,7 @@ class PutStaticOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>H', data[1:3])[0]
+    self.index = U2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'putstatic(%d)' % self.index
 
@@ -199,7 +217,7 @@ class GetStaticOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>H', data[1:3])[0]
+    self.index = U2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'getstatic(%d)' % self.index
 
@@ -207,7 +225,7 @@ class CheckCastOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>H', data[1:3])[0]
+    self.index = U2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'checkcast(%d)' % self.index
 
@@ -215,7 +233,7 @@ class InstanceOfOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>H', data[1:3])[0]
+    self.index = U2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'instanceof(%d)' % self.index
 
@@ -271,7 +289,7 @@ class GetFieldOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>H', data[1:3])[0]
+    self.index = U2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'getfield(%d)' % self.index
 
@@ -279,7 +297,7 @@ class PutFieldOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>H', data[1:3])[0]
+    self.index = U2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'putfield(%d)' % self.index
 
@@ -287,7 +305,7 @@ class InvokeVirtualOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>H', data[1:3])[0]
+    self.index = U2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'invokevirtual(%d)' % self.index
 
@@ -295,7 +313,7 @@ class InvokeSpecialOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>H', data[1:3])[0]
+    self.index = U2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'invokespecial(%d)' % self.index
 
@@ -303,7 +321,7 @@ class IfNullOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'ifnull(%d)' % self.index
 
@@ -311,7 +329,7 @@ class IfNotNullOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'ifnonnull(%d)' % self.index
 
@@ -319,7 +337,7 @@ class IfEqOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'ifeq(%d)' % self.index
 
@@ -327,7 +345,7 @@ class IfNeOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'ifne(%d)' % self.index
 
@@ -335,7 +353,7 @@ class IfLtOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'iflt(%d)' % self.index
 
@@ -343,7 +361,7 @@ class IfGeOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'ifge(%d)' % self.index
 
@@ -351,7 +369,7 @@ class IfGtOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'ifgt(%d)' % self.index
 
@@ -359,7 +377,7 @@ class IfLeOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'ifle(%d)' % self.index
 
@@ -367,7 +385,7 @@ class IfReferenceCmpEqOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'if_acmpeq(%d)' % self.index
 
@@ -375,7 +393,7 @@ class IfReferenceCmpNeOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'if_acmpne(%d)' % self.index
 
@@ -383,7 +401,7 @@ class IfIntegerCmpEqOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'if_icmpeq(%d)' % self.index
 
@@ -391,7 +409,7 @@ class IfIntegerCmpNeOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'if_icmpne(%d)' % self.index
 
@@ -399,7 +417,7 @@ class IfIntegerCmpLtOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'if_icmplt(%d)' % self.index
 
@@ -407,7 +425,7 @@ class IfIntegerCmpGeOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'if_icmpge(%d)' % self.index
 
@@ -415,7 +433,7 @@ class IfIntegerCmpGtOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'if_icmpgt(%d)' % self.index
 
@@ -423,7 +441,7 @@ class IfIntegerCmpLeOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'if_icmple(%d)' % self.index
 
@@ -431,7 +449,7 @@ class GotoOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'goto(%d)' % self.index
 
@@ -439,7 +457,7 @@ class GotowOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 5
-    self.index = struct.unpack('>i', data[1:5])[0]
+    self.index = S4.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'goto_w(%d)' % self.index
 
@@ -447,7 +465,7 @@ class JsrOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>h', data[1:3])[0]
+    self.index = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'jsr(%d)' % self.index
 
@@ -455,7 +473,7 @@ class ReturnToIndexOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 2
-    self.index = ord(data[1])
+    self.index = ord(data[addr + 1])
   def __str__(self):
     return 'ret(%d)' % self.index
 
@@ -463,7 +481,7 @@ class JsrwOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 5
-    self.index = struct.unpack('>i', data[1:5])[0]
+    self.index = S4.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'jsrw(%d)' % self.index
 
@@ -543,7 +561,7 @@ class IntegerIncrementOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index, self.const = struct.unpack('>bb', data[1:3])
+    self.index, self.const = S1S1.unpack_from(data, addr + 1)
   def __str__(self):
     return 'iinc(%d, %d)' % (self.index, self.const)
 
@@ -671,7 +689,7 @@ class CreateNewArrayOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>H', data[1:3])[0]
+    self.index = U2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'anewarray(%d)' % self.index
 
@@ -679,7 +697,7 @@ class CreateNewArraySizedOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 2
-    self.const = ord(data[1])
+    self.const = ord(data[addr + 1])
   def __str__(self):
     return 'newarray(%d)' % self.const
 
@@ -687,7 +705,7 @@ class CreateNewMultiArrayOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 4
-    self.index, self.const = struct.unpack('>HB', data[1:4])
+    self.index, self.const = U2U1.unpack_from(data, addr + 1)
   def __str__(self):
     return 'multianewarray(%d, %d)' % (self.index, self.const)
 
@@ -695,7 +713,7 @@ class NewOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>H', data[1:3])[0]
+    self.index = U2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'new(%d)' % self.index
 
@@ -751,7 +769,7 @@ class StoreReferenceIntoIndexOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 2
-    self.index = ord(data[1])
+    self.index = ord(data[addr + 1])
   def __str__(self):
     return 'astore(%d)' % self.index
 
@@ -759,7 +777,7 @@ class LoadReferenceFromIndexOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 2
-    self.index = ord(data[1])
+    self.index = ord(data[addr + 1])
   def __str__(self):
     return 'aload(%d)' % self.index
 
@@ -791,7 +809,7 @@ class PushConstantOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 2
-    self.index = ord(data[1])
+    self.index = ord(data[addr + 1])
   def __str__(self):
     return 'ldc(%d)' % self.index
 
@@ -799,7 +817,7 @@ class PushShortOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.const = struct.unpack('>h', data[1:3])[0]
+    self.const = S2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'sipush(%d)' % self.const
 
@@ -807,7 +825,7 @@ class PushByteAsIntOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 2
-    self.const = struct.unpack('>b', data[1:2])[0]
+    self.const = S1.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'sipush(%d)' % self.const
 
@@ -815,7 +833,7 @@ class PushConstantWideOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>H', data[1:3])[0]
+    self.index = U2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'ldc_w(%d)' % self.index
 
@@ -823,7 +841,7 @@ class PushConstantWideLongOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 3
-    self.index = struct.unpack('>H', data[1:3])[0]
+    self.index = U2.unpack_from(data, addr + 1)[0]
   def __str__(self):
     return 'ldc2_w(%d)' % self.index
 
@@ -855,7 +873,7 @@ class StoreIntegerIntoIndexVariableOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 2
-    self.index = ord(data[1])
+    self.index = ord(data[addr + 1])
   def __str__(self):
     return 'istore(%d)' % self.index
 
@@ -935,7 +953,7 @@ class StoreLongIntoIndexVariableOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 2
-    self.index = ord(data[1])
+    self.index = ord(data[addr + 1])
   def __str__(self):
     return 'lstore(%d)' % self.index
 
@@ -943,7 +961,7 @@ class StoreFloatIntoIndexVariableOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 2
-    self.index = ord(data[1])
+    self.index = ord(data[addr + 1])
   def __str__(self):
     return 'fstore(%d)' % self.index
 
@@ -951,7 +969,7 @@ class StoreDoubleIntoIndexVariableOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 2
-    self.index = ord(data[1])
+    self.index = ord(data[addr + 1])
   def __str__(self):
     return 'dstore(%d)' % self.index
 
@@ -959,7 +977,7 @@ class LoadIntegerFromIndexVariableOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 2
-    self.index = ord(data[1])
+    self.index = ord(data[addr + 1])
   def __str__(self):
     return 'iload(%d)' % self.index
 
@@ -991,7 +1009,7 @@ class LoadLongFromIndexVariableOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 2
-    self.index = ord(data[1])
+    self.index = ord(data[addr + 1])
   def __str__(self):
     return 'lload(%d)' % self.index
 
@@ -1023,7 +1041,7 @@ class LoadFloatFromIndexVariableOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 2
-    self.index = ord(data[1])
+    self.index = ord(data[addr + 1])
   def __str__(self):
     return 'fload(%d)' % self.index
 
@@ -1085,7 +1103,7 @@ class LoadDoubleFromIndexVariableOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     self.size = 2
-    self.index = ord(data[1])
+    self.index = ord(data[addr + 1])
   def __str__(self):
     return 'dload(%d)' % self.index
 
@@ -1339,13 +1357,13 @@ class TableSwitchOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     # Have to make the default align up on a 4-byte boundary.
-    addr = (addr + 1) & 3
-    nulls = (4 - addr) & 3
-    if data[1:1 + nulls] != '\x00' * nulls:
+    nulls = (4 - ((addr + 1) & 3)) & 3
+    start = addr + 1 + nulls
+    if data[addr + 1:start] != '\x00' * nulls:
       raise OpcodeError("Bad tableswitch opcode: not the right number of nulls")
-    self.default, self.low, self.high = struct.unpack('>III', data[1 + nulls:13 + nulls])
+    self.default, self.low, self.high = U4X3.unpack_from(data, start)
     jumpTableSize = self.high - self.low + 1
-    self.jumpTable = struct.unpack('>' + 'I' * jumpTableSize, data[13 + nulls:13 + nulls + jumpTableSize * 4])
+    self.jumpTable = struct.unpack_from('>%dI' % jumpTableSize, data, start + 12)
     self.size = jumpTableSize * 4 + 12 + 1 + nulls
   def __str__(self):
     return 'tableswitch' + str((self.default, self.low, self.high) + self.jumpTable)
@@ -1354,12 +1372,12 @@ class LookupSwitchOpcode(Opcode):
   def __init__(self, data, addr):
     Opcode.__init__(self, data, addr)
     # Have to make the default align up on a 4-byte boundary.
-    addr = (addr + 1) & 3
-    nulls = (4 - addr) & 3
-    if data[1:1 + nulls] != '\x00' * nulls:
+    nulls = (4 - ((addr + 1) & 3)) & 3
+    start = addr + 1 + nulls
+    if data[addr + 1:start] != '\x00' * nulls:
       raise OpcodeError("Bad tableswitch opcode: not the right number of nulls")
-    self.default, numPairs = struct.unpack('>II', data[1 + nulls:9 + nulls])
-    self.pairs = struct.unpack('>' + 'I' * (numPairs * 2), data[9 + nulls:9 + nulls + numPairs * 8])
+    self.default, numPairs = U4X2.unpack_from(data, start)
+    self.pairs = struct.unpack_from('>%dI' % (numPairs * 2), data, start + 8)
     self.size = numPairs * 8 + 8 + 1 + nulls
   def __str__(self):
     return 'lookupswitch' + str((self.default, ) + self.pairs)
@@ -1369,14 +1387,14 @@ class WideOpcode(Opcode):
     Opcode.__init__(self, data, addr)
     # Widen the next load/store/ret/iinc.
     # iinc is special -- 5 bytes
-    if opcodeTable[data[1]] == IntegerIncrementOpcode:
-      iinc = IntegerIncrementOpcode(data[1:4], addr + 1)
-      iinc.index, iinc.const = struct.unpack('>HH', data[2:6])
+    if opcodeTable[ord(data[addr + 1])] == IntegerIncrementOpcode:
+      iinc = IntegerIncrementOpcode(data, addr + 1)
+      iinc.index, iinc.const = U2U2.unpack_from(data, addr + 2)
       iinc.size = 5
       self.op = iinc
     else:
-      self.op = opcodeTable[data[1]](data[1:3], addr + 1)
-      self.op.index = struct.unpack('>H', data[2:4])[0]
+      self.op = opcodeTable[ord(data[addr + 1])](data, addr + 1)
+      self.op.index = U2.unpack_from(data, addr + 2)[0]
       self.op.size = 3
     self.size = self.op.size + 1
   def __str__(self):
@@ -1609,3 +1627,193 @@ opcodeTable[0xc9] = JsrwOpcode
 opcodeTable[0xca] = BreakpointOpcode
 opcodeTable[0xfe] = ImplementationDependentDebugger1Opcode
 opcodeTable[0xff] = ImplementationDependentDebugger2Opcode
+
+
+# Instruction length and primary operand reader for every fixed-size opcode.
+# tableswitch, lookupswitch and wide have variable lengths and are marked 0.
+operandTable = [(1, None)] * 256
+for _op in (0x12, 0x15, 0x16, 0x17, 0x18, 0x19, 0x36, 0x37, 0x38, 0x39, 0x3a,
+            0xa9, 0xbc):
+  operandTable[_op] = (2, U1)
+operandTable[0x84] = (3, U1)
+operandTable[0x10] = (2, S1)
+operandTable[0x11] = (3, S2)
+for _op in range(0x99, 0xa9) + [0xc6, 0xc7]:
+  operandTable[_op] = (3, S2)
+for _op in [0x13, 0x14, 0xbb, 0xbd, 0xc0, 0xc1] + range(0xb2, 0xb9):
+  operandTable[_op] = (3, U2)
+operandTable[0xc5] = (4, U2)
+operandTable[0xb9] = (5, U2)
+operandTable[0xba] = (5, U2)
+operandTable[0xc8] = (5, S4)
+operandTable[0xc9] = (5, S4)
+for _op in (0xaa, 0xab, 0xc4):
+  operandTable[_op] = (0, None)
+del _op
+opcodeLengths = [size for size, _ in operandTable]
+
+invokeOpcodes = frozenset([0xb6, 0xb7, 0xb8, 0xb9, 0xba])
+# ldc, ldc_w and ldc2_w.
+constantLoadOpcodes = frozenset([0x12, 0x13, 0x14])
+
+# (slots popped, slots pushed) for every opcode whose effect on the operand
+# stack is fixed; long and double values take two slots. None marks loads,
+# stores, dups, constants, field access, calls, new, checkcast, wide and
+# multianewarray, whose effect depends on operands or which move values
+# around rather than compute them.
+stackEffects = [(0, 0)] * 256
+for _ops, _effect in (
+    ([0x01] + range(0x02, 0x09) + [0x0b, 0x0c, 0x0d, 0x10, 0x11] +
+     range(0x15, 0x19, 2) + range(0x1a, 0x1e) + range(0x22, 0x26) +
+     [0xa8, 0xc9], (0, 1)),
+    ([0x09, 0x0a, 0x0e, 0x0f, 0x16, 0x18] + range(0x1e, 0x22) +
+     range(0x26, 0x2a), (0, 2)),
+    ([0x2e, 0x30, 0x32, 0x33, 0x34, 0x35, 0x60, 0x62, 0x64, 0x66, 0x68, 0x6a,
+      0x6c, 0x6e, 0x70, 0x72, 0x78, 0x7a, 0x7c, 0x7e, 0x80, 0x82, 0x95, 0x96],
+     (2, 1)),
+    ([0x2f, 0x31], (2, 2)),
+    ([0x36, 0x38] + range(0x3b, 0x3f) + range(0x43, 0x47) +
+     range(0x99, 0x9f) + [0x57, 0xaa, 0xab, 0xac, 0xae, 0xb0, 0xbf, 0xc2,
+                          0xc3, 0xc6, 0xc7], (1, 0)),
+    ([0x37, 0x39] + range(0x3f, 0x43) + range(0x47, 0x4b) +
+     range(0x9f, 0xa7) + [0x58, 0xad, 0xaf], (2, 0)),
+    ([0x4f, 0x51, 0x53, 0x54, 0x55, 0x56], (3, 0)),
+    ([0x50, 0x52], (4, 0)),
+    ([0x61, 0x63, 0x65, 0x67, 0x69, 0x6b, 0x6d, 0x6f, 0x71, 0x73, 0x7f, 0x81,
+      0x83], (4, 2)),
+    ([0x74, 0x76, 0x86, 0x8b, 0x91, 0x92, 0x93, 0xbc, 0xbd, 0xbe, 0xc1],
+     (1, 1)),
+    ([0x75, 0x77, 0x8a, 0x8f], (2, 2)),
+    ([0x79, 0x7b, 0x7d], (3, 2)),
+    ([0x85, 0x87, 0x8c, 0x8d], (1, 2)),
+    ([0x88, 0x89, 0x8e, 0x90], (2, 1)),
+    ([0x94, 0x97, 0x98], (4, 1)),
+    ([0x12, 0x13, 0x14, 0x19, 0x3a] + range(0x2a, 0x2e) +
+     range(0x4b, 0x4f) + range(0x59, 0x60) + range(0xb2, 0xbc) +
+     [0xc0, 0xc4, 0xc5], None)):
+  for _op in _ops:
+    stackEffects[_op] = _effect
+del _op, _ops, _effect
+# Instructions after which the next one is not reached by falling through.
+blockEndOpcodes = frozenset([0xa7, 0xa9, 0xaa, 0xab, 0xac, 0xad, 0xae, 0xaf,
+                             0xb0, 0xb1, 0xbf, 0xc8])
+
+
+class InstructionStream(object):
+  """Compact, column-oriented decoding of a method's bytecode.
+
+  Instruction i has opcode opcodes[i], lives at offsets[i] in the code array
+  and has primary operand operands[i]: the constant pool index for field,
+  method, class and ldc instructions, the local variable for loads, stores,
+  iinc and ret, the branch offset for jumps, the pushed value for bipush and
+  sipush, and the default target for switches. Nothing is allocated per
+  instruction; Op(i) builds the full Opcode object when one is wanted.
+  """
+  __slots__ = ('data', 'opcodes', 'offsets', 'operands')
+
+  def __init__(self, data, opcodes, offsets, operands):
+    self.data = data
+    self.opcodes = opcodes
+    self.offsets = offsets
+    self.operands = operands
+
+  def __len__(self):
+    return len(self.opcodes)
+
+  def Op(self, i):
+    return opcodeTable[self.opcodes[i]](self.data, self.offsets[i])
+
+  def Ops(self):
+    for i in xrange(len(self.opcodes)):
+      yield self.Op(i)
+
+
+def VariableLength(data, addr):
+  """Returns the size of the tableswitch, lookupswitch or wide at addr."""
+  opcode = ord(data[addr])
+  if opcode == 0xc4:
+    if ord(data[addr + 1]) == 0x84:
+      return 6
+    return 4
+  nulls = (4 - ((addr + 1) & 3)) & 3
+  start = addr + 1 + nulls
+  if opcode == 0xaa:
+    low, high = S4S4.unpack_from(data, start + 4)
+    return 1 + nulls + 12 + (high - low + 1) * 4
+  numPairs = S4.unpack_from(data, start + 4)[0]
+  return 1 + nulls + 8 + numPairs * 8
+
+
+def VariableOperand(data, addr):
+  """Primary operand of a variable-length instruction (see VariableLength)."""
+  if ord(data[addr]) == 0xc4:
+    return U2.unpack_from(data, addr + 2)[0]
+  return S4.unpack_from(data, addr + 1 + ((4 - ((addr + 1) & 3)) & 3))[0]
+
+
+def Decode(data):
+  """Decodes a code array into an InstructionStream."""
+  opcodes = array('B')
+  offsets = array('i')
+  operands = array('i')
+  addr = 0
+  end = len(data)
+  while addr < end:
+    opcode = ord(data[addr])
+    size, reader = operandTable[opcode]
+    if reader is not None:
+      operand = reader.unpack_from(data, addr + 1)[0]
+    elif size:
+      operand = 0
+    else:
+      size = VariableLength(data, addr)
+      operand = VariableOperand(data, addr)
+    opcodes.append(opcode)
+    offsets.append(addr)
+    operands.append(operand)
+    addr += size
+  return InstructionStream(data, opcodes, offsets, operands)
+
+
+def ScanCalls(data):
+  """Decodes only the call sites of a code array.
+
+  Uses the static length table to hop from instruction to instruction
+  without reading operands. The result is an InstructionStream holding each
+  invoke instruction preceded by whatever instruction immediately precedes
+  it in the bytecode (usually the ldc or nested call the analyses look at),
+  so entry i - 1 is always the true predecessor of a call at entry i.
+  """
+  opcodes = array('B')
+  offsets = array('i')
+  operands = array('i')
+  lengths = opcodeLengths
+  invokes = invokeOpcodes
+  prevAddr = -1
+  addr = 0
+  end = len(data)
+  while addr < end:
+    opcode = ord(data[addr])
+    size = lengths[opcode]
+    if not size:
+      size = VariableLength(data, addr)
+    elif opcode in invokes:
+      if prevAddr >= 0 and (not offsets or offsets[-1] != prevAddr):
+        prevOpcode = ord(data[prevAddr])
+        prevSize, reader = operandTable[prevOpcode]
+        if reader is not None:
+          operand = reader.unpack_from(data, prevAddr + 1)[0]
+        elif prevSize:
+          operand = 0
+        else:
+          # wide, tableswitch or lookupswitch, read as Decode reads them.
+          operand = VariableOperand(data, prevAddr)
+        opcodes.append(prevOpcode)
+        offsets.append(prevAddr)
+        operands.append(operand)
+      opcodes.append(opcode)
+      offsets.append(addr)
+      operands.append(U2.unpack_from(data, addr + 1)[0])
+    prevAddr = addr
+    addr += size
+  return InstructionStream(data, opcodes, offsets, operands)
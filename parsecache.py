@@ -0,0 +1,168 @@
+# Copyright 2026 The guicelint Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-disk cache of parsed class summaries.
+
+Entries are keyed by the zip entry's name, CRC32 and size plus the parser
+version, so a changed class or a newer parser never sees an old summary.
+Each file carries a checksum of its payload; anything that does not match
+is treated as a miss and rebuilt.
+
+Classes in directories have no CRC to key on. A DirectoryIndex keeps the
+summaries of a whole directory in one file instead, keyed on each file's
+mtime and size, so an edit-compile-lint cycle only parses what changed.
+"""
+
+import hashlib
+import marshal
+import os
+import tempfile
+import zlib
+
+MAGIC = 'guicelint-summary'
+
+
+class ParseCache(object):
+  def __init__(self, directory, version):
+    self.directory = directory
+    self.version = version
+    self.hits = 0
+    self.misses = 0
+    self.rebuilt = 0
+    if not os.path.isdir(directory):
+      os.makedirs(directory)
+
+  def Path(self, name, crc, size):
+    digest = hashlib.sha1(name).hexdigest()
+    return os.path.join(self.directory, digest[:2],
+                        '%s-%08x-%d-v%d' % (digest[2:], crc & 0xffffffff, size,
+                                            self.version))
+
+  def Get(self, name, crc, size):
+    """Returns the cached summary for an entry, or None."""
+    path = self.Path(name, crc, size)
+    try:
+      f = open(path, 'rb')
+    except IOError:
+      self.misses += 1
+      return None
+    try:
+      data = f.read()
+    finally:
+      f.close()
+    try:
+      header, payload = marshal.loads(data)
+      if (header != (MAGIC, self.version, name, crc, size,
+                     zlib.crc32(payload))):
+        raise ValueError('stale summary')
+      summary = marshal.loads(payload)
+    except (EOFError, ValueError, TypeError):
+      self.rebuilt += 1
+      return None
+    self.hits += 1
+    return summary
+
+  def Put(self, name, crc, size, summary):
+    path = self.Path(name, crc, size)
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+      try:
+        os.makedirs(directory)
+      except OSError:
+        # Somebody else made it first.
+        pass
+    payload = marshal.dumps(summary)
+    header = (MAGIC, self.version, name, crc, size, zlib.crc32(payload))
+    fd, tmp = tempfile.mkstemp(dir=directory)
+    f = os.fdopen(fd, 'wb')
+    try:
+      f.write(marshal.dumps((header, payload)))
+    finally:
+      f.close()
+    os.rename(tmp, path)
+
+  def Stats(self):
+    return 'parse cache: %d hits, %d misses, %d rebuilt' % (
+        self.hits, self.misses, self.rebuilt)
+
+
+class DirectoryIndex(object):
+  """Summaries of the class files under one directory, kept between runs.
+
+  Maps each file's name under the directory to ((mtime, size), summary).
+  The index is read whole when created and written back by Save, only if
+  something changed; a corrupt or stale index is simply started afresh.
+  """
+
+  def __init__(self, cacheDirectory, directory, version):
+    self.version = version
+    digest = hashlib.sha1(os.path.abspath(directory)).hexdigest()
+    self.path = os.path.join(cacheDirectory, 'dir-%s-v%d' % (digest, version))
+    self.directory = directory
+    self.entries = {}
+    self.changed = False
+    self.hits = 0
+    self.misses = 0
+    try:
+      f = open(self.path, 'rb')
+    except IOError:
+      return
+    try:
+      data = f.read()
+    finally:
+      f.close()
+    try:
+      header, payload = marshal.loads(data)
+      if header != (MAGIC, self.version, self.path, zlib.crc32(payload)):
+        raise ValueError('stale index')
+      self.entries = marshal.loads(payload)
+    except (EOFError, ValueError, TypeError):
+      self.entries = {}
+
+  def Get(self, name, stamp):
+    """Returns name's summary if it still has this (mtime, size), or None."""
+    entry = self.entries.get(name)
+    if entry is None or entry[0] != stamp:
+      self.misses += 1
+      return None
+    self.hits += 1
+    return entry[1]
+
+  def Put(self, name, stamp, summary):
+    self.entries[name] = (stamp, summary)
+    self.changed = True
+
+  def Save(self, isLive=None):
+    """Writes the index back, first dropping names isLive rejects."""
+    if isLive is not None:
+      for name in self.entries.keys():
+        if not isLive(name):
+          del self.entries[name]
+          self.changed = True
+    if not self.changed:
+      return
+    payload = marshal.dumps(self.entries)
+    header = (MAGIC, self.version, self.path, zlib.crc32(payload))
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path))
+    f = os.fdopen(fd, 'wb')
+    try:
+      f.write(marshal.dumps((header, payload)))
+    finally:
+      f.close()
+    os.rename(tmp, self.path)
+    self.changed = False
+
+  def Stats(self):
+    return 'directory index %s: %d hits, %d misses' % (
+        self.directory, self.hits, self.misses)
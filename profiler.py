@@ -0,0 +1,91 @@
+# Copyright 2026 The guicelint Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-phase wall time and counters for guice_lint --profile.
+
+Phases are measured by wrapping functions with Instrument, which is only
+done when profiling is requested, so an unprofiled run executes the
+original functions untouched.
+"""
+
+import functools
+import json
+import time
+
+
+class Profile(object):
+  def __init__(self):
+    # phase -> [calls, total seconds, self seconds]
+    self.phases = {}
+    self.counters = {}
+    self.stack = []
+    self.active = {}
+
+  def Count(self, name, n=1):
+    self.counters[name] = self.counters.get(name, 0) + n
+
+  def Wrap(self, phase, f):
+    """Returns f, timed as part of phase.
+
+    Total time counts only the outermost call of a phase, so recursion and
+    nesting do not double count; self time excludes nested phases.
+    """
+    stack = self.stack
+    active = self.active
+    stats = self.phases.setdefault(phase, [0, 0.0, 0.0])
+
+    @functools.wraps(f)
+    def Timed(*args, **kwargs):
+      start = time.time()
+      stack.append(0.0)
+      active[phase] = active.get(phase, 0) + 1
+      try:
+        return f(*args, **kwargs)
+      finally:
+        elapsed = time.time() - start
+        children = stack.pop()
+        if stack:
+          stack[-1] += elapsed
+        active[phase] -= 1
+        stats[0] += 1
+        if not active[phase]:
+          stats[1] += elapsed
+        stats[2] += elapsed - children
+    return Timed
+
+  def Instrument(self, owner, name, phase):
+    """Replaces owner.name, a function or method, with a timed version.
+
+    owner may be a module, a class or a single instance; instrumenting an
+    instance or a subclass leaves everything else untouched.
+    """
+    setattr(owner, name, self.Wrap(phase, getattr(owner, name)))
+
+  def Table(self):
+    lines = ['%-20s %10s %10s %10s' % ('phase', 'calls', 'total s', 'self s')]
+    for phase in sorted(self.phases):
+      calls, total, own = self.phases[phase]
+      lines.append('%-20s %10d %10.3f %10.3f' % (phase, calls, total, own))
+    lines.append('')
+    for name in sorted(self.counters):
+      lines.append('%-31s %10d' % (name, self.counters[name]))
+    return '\n'.join(lines)
+
+  def Json(self):
+    return json.dumps({
+        'phases': dict((phase, {'calls': calls, 'total': total, 'self': own})
+                       for phase, (calls, total, own)
+                       in self.phases.iteritems()),
+        'counters': self.counters,
+    }, indent=2, sort_keys=True)